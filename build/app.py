@@ -1,6 +1,10 @@
 import streamlit as st
 import os
+import time
 from code import VideoTranslator, TranslationResult
+from model_registry import ModelRegistry, get_model_registry
+from jobs import JobManager, Job
+from progress import StageLimiter
 
 
 
@@ -8,10 +12,49 @@ from code import VideoTranslator, TranslationResult
 os.environ["PATH"] += os.pathsep + r"C:\Users\ramud\Desktop\COADING APPS\ffmeg\ffmpeg-2025-02-13-git-19a2d26177-essentials_build\bin"  # Adjust the path accordingly
 
 
-def initialize_translator():
-    if 'translator' not in st.session_state:
-        st.session_state.translator = VideoTranslator()
-    return st.session_state.translator
+@st.cache_resource
+def get_shared_model_registry() -> ModelRegistry:
+    # One registry per server process, so every session reuses the loaded Whisper weights
+    return get_model_registry()
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    # One translator and job queue per server process, shared by every session;
+    # the stage limiter keeps concurrent jobs from running Whisper side by side
+    translator = VideoTranslator(model_registry=get_shared_model_registry(), stage_limiter=StageLimiter())
+    return JobManager(translator, max_workers=2)
+
+def current_job(manager: JobManager):
+    # Reattach to a running job after a page reload via the ?job= query parameter
+    job_id = st.session_state.get('job_id') or st.query_params.get('job')
+    return manager.get(job_id) if job_id else None
+
+def display_job(manager: JobManager, job: Job, language_mapping: dict):
+    progress_bar = st.progress(job.progress)
+    status_text = st.empty()
+    status_text.text(job.message)
+
+    if not job.done:
+        if st.button("Cancel", key=f"cancel_{job.job_id}"):
+            manager.cancel(job.job_id)
+        # Poll the job store until the job finishes
+        time.sleep(1)
+        st.rerun()
+
+    if job.status == 'succeeded':
+        progress_bar.progress(1.0)
+        st.success("Video processing completed successfully!")
+    elif job.status == 'cancelled':
+        st.warning("Processing was cancelled.")
+    else:
+        st.error(f"Error: {job.error}")
+
+    # Display results
+    if job.results:
+        tabs = st.tabs([language_mapping[lang] for lang in job.results])
+        for tab, (lang, result) in zip(tabs, job.results.items()):
+            with tab:
+                display_results(result, key_suffix=lang)
 
 def create_language_mapping():
     return {
@@ -23,16 +66,16 @@ def create_language_mapping():
         'kn': 'Kannada'
     }
 
-def display_results(result: TranslationResult):
+def display_results(result: TranslationResult, key_suffix: str = ""):
     if result.success:
         # Display transcribed and translated text
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("Original Transcription")
-            st.text_area("", result.original_text, height=200)
+            st.text_area("", result.original_text, height=200, key=f"original_{key_suffix}")
         with col2:
             st.subheader("Translated Text")
-            st.text_area("", result.translated_text, height=200)
+            st.text_area("", result.translated_text, height=200, key=f"translated_{key_suffix}")
 
         # Video player
         st.subheader("Translated Video")
@@ -40,30 +83,38 @@ def display_results(result: TranslationResult):
         video_bytes = video_file.read()
         st.video(video_bytes)
 
+        # Stage timings
+        if result.timings:
+            st.caption(" · ".join(f"{stage}: {seconds:.1f}s" for stage, seconds in result.timings.items()))
+
         # Download buttons
+        video_ext = os.path.splitext(result.output_video_path)[1] or '.webm'
         col1, col2, col3 = st.columns(3)
         with col1:
             with open(result.output_video_path, 'rb') as f:
                 st.download_button(
                     label="Download Translated Video",
+                    key=f"download_translated_video_{key_suffix}",
                     data=f.read(),
-                    file_name=f'{result.video_title}_translated.webm',
-                    mime='video/webm'
+                    file_name=f'{result.video_title}_{key_suffix or "translated"}{video_ext}',
+                    mime=f'video/{video_ext.lstrip(".")}'
                 )
         with col2:
             with open(result.translated_text_path, 'rb') as f:
                 st.download_button(
                     label="Download Translated Text",
+                    key=f"download_translated_text_{key_suffix}",
                     data=f.read(),
-                    file_name=f'{result.video_title}_translated.txt',
+                    file_name=f'{result.video_title}_{key_suffix or "translated"}.txt',
                     mime='text/plain'
                 )
         with col3:
             with open(result.translated_audio_path, 'rb') as f:
                 st.download_button(
                     label="Download Translated Audio",
+                    key=f"download_translated_audio_{key_suffix}",
                     data=f.read(),
-                    file_name=f'{result.video_title}_translated.mp3',
+                    file_name=f'{result.video_title}_{key_suffix or "translated"}.mp3',
                     mime='audio/mpeg'
                 )
     else:
@@ -76,8 +127,8 @@ def main():
         layout="wide"
     )
 
-    # Initialize the translator
-    translator = initialize_translator()
+    # Background jobs are shared across sessions and survive page reloads
+    manager = get_job_manager()
 
     # Main UI
     st.title("🎥 YouTube Video Translator")
@@ -86,9 +137,10 @@ def main():
     # Sidebar for language selection
     st.sidebar.header("Settings")
     language_mapping = create_language_mapping()
-    target_language = st.sidebar.selectbox(
-        "Select Target Language",
+    target_languages = st.sidebar.multiselect(
+        "Select Target Languages",
         options=list(language_mapping.keys()),
+        default=['hi'],
         format_func=lambda x: language_mapping[x]
     )
 
@@ -100,39 +152,15 @@ def main():
             st.error("Please enter a valid YouTube URL")
             return
 
-        if st.button("Process Video"):
-            with st.spinner("Processing video..."):
-                # Create progress tracking
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-
-                # Process States
-                states = [
-                    "Downloading video...",
-                    "Transcribing audio...",
-                    "Translating text...",
-                    "Generating speech...",
-                    "Creating final video..."
-                ]
-
-                # Update progress bar during processing
-                for i, state in enumerate(states):
-                    status_text.text(state)
-                    progress_bar.progress((i + 1) * 20)
-
-                # Process the video
-                result = translator.process_video(youtube_url, target_language)
-                
-                if result.success:
-                    progress_bar.progress(100)
-                    status_text.text("Processing complete!")
-                    st.success("Video processing completed successfully!")
-                    
-                    # Display results
-                    display_results(result)
-                else:
-                    status_text.text("Processing failed!")
-                    st.error(f"Error: {result.error_message}")
+        if st.button("Process Video", disabled=not target_languages):
+            # Process the video once in the background and dub it into every selected language
+            job = manager.submit(youtube_url, target_languages)
+            st.session_state.job_id = job.job_id
+            st.query_params['job'] = job.job_id
+
+    job = current_job(manager)
+    if job is not None:
+        display_job(manager, job, language_mapping)
 
 if __name__ == "__main__":
     main()
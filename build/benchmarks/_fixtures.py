@@ -0,0 +1,33 @@
+import os
+import subprocess
+import imageio_ffmpeg as ffmpeg
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def make_tone_audio(duration: float = 5.0, name: str = None) -> str:
+    """Render a short mono tone into benchmarks/fixtures and return its path."""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, name or f'tone_{int(duration)}s.wav')
+    if not os.path.exists(path):
+        subprocess.run([
+            ffmpeg.get_ffmpeg_exe(), '-y', '-loglevel', 'error',
+            '-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration}',
+            '-ac', '1', '-ar', '16000', path
+        ], check=True)
+    return path
+
+
+def make_test_video(duration: float = 60.0, name: str = None) -> str:
+    """Render a small test-pattern video with a tone soundtrack and return its path."""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, name or f'testsrc_{int(duration)}s.mp4')
+    if not os.path.exists(path):
+        subprocess.run([
+            ffmpeg.get_ffmpeg_exe(), '-y', '-loglevel', 'error',
+            '-f', 'lavfi', '-i', f'testsrc=duration={duration}:size=320x240:rate=15',
+            '-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration}',
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-c:a', 'aac', '-shortest', path
+        ], check=True)
+    return path
@@ -0,0 +1,62 @@
+"""Compare cold and warm Whisper transcription latency.
+
+Cold runs reload the weights for every call, which is what transcribe_audio
+used to do. Warm runs go through the shared ModelRegistry.
+
+    python benchmarks/bench_model_cache.py --runs 3 --model-size base
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import whisper
+from model_registry import ModelRegistry
+from _fixtures import make_tone_audio
+
+
+def bench_cold(audio_path: str, model_size: str, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        model = whisper.load_model(model_size)
+        model.transcribe(audio_path)
+        timings.append(time.perf_counter() - start)
+        del model
+    return timings
+
+
+def bench_warm(audio_path: str, model_size: str, runs: int) -> list:
+    registry = ModelRegistry()
+    registry.preload(model_size)  # first load is excluded from the warm numbers
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        with registry.lease(model_size) as model:
+            model.transcribe(audio_path)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--model-size', default='base')
+    parser.add_argument('--duration', type=float, default=5.0, help='fixture length in seconds')
+    args = parser.parse_args()
+
+    audio_path = make_tone_audio(args.duration)
+    cold = bench_cold(audio_path, args.model_size, args.runs)
+    warm = bench_warm(audio_path, args.model_size, args.runs)
+
+    print(f"fixture: {audio_path} ({args.duration:.0f}s), model: {args.model_size}, runs: {args.runs}")
+    print(f"cold  median {statistics.median(cold):.3f}s  min {min(cold):.3f}s")
+    print(f"warm  median {statistics.median(warm):.3f}s  min {min(warm):.3f}s")
+    print(f"speedup {statistics.median(cold) / statistics.median(warm):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
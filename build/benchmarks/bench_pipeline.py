@@ -0,0 +1,151 @@
+"""End-to-end offline benchmark of VideoTranslator.process_video_multi.
+
+Runs the full pipeline on a generated local video with the local
+translation and TTS backends, so no network access is needed. Whisper can
+be replaced by a stub that emits evenly spaced segments (the default) to
+measure pipeline overhead alone, or a real model size can be given.
+
+    python benchmarks/bench_pipeline.py --duration 120 --languages hi ta --output report.json
+    python benchmarks/bench_pipeline.py --baseline report.json   # exit 1 on regression
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import imageio_ffmpeg as ffmpeg
+from code import VideoTranslator
+from metrics import peak_rss_bytes
+from translation import LocalTranslationBackend
+from tts import LocalTTSBackend
+from _fixtures import make_test_video
+from bench_term_matcher import make_transcript
+
+STUB_SAMPLE_RATE = 16000
+
+
+class StubWhisperModel:
+    """Returns one canned segment every ``segment_seconds`` of audio."""
+
+    def __init__(self, duration: float, segment_seconds: float = 4.0):
+        self.duration = duration
+        self.segment_seconds = segment_seconds
+
+    def transcribe(self, audio):
+        duration = self.duration if isinstance(audio, str) else len(audio) / STUB_SAMPLE_RATE
+        words = make_transcript(max(1, int(duration // 60) + 1)).split()
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(start + self.segment_seconds, duration)
+            text = " ".join(words[len(segments) * 8:(len(segments) + 1) * 8]) or "data"
+            segments.append({'start': start, 'end': end, 'text': text})
+            start = end
+        return {'text': " ".join(seg['text'] for seg in segments), 'segments': segments}
+
+
+class StubModelRegistry:
+    def __init__(self, duration: float):
+        self.model = StubWhisperModel(duration)
+
+    @contextmanager
+    def lease(self, model_size=None, device=None, max_replicas=1):
+        yield self.model
+
+
+def run_once(video_path: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as base_dir:
+        registry = StubModelRegistry(args.duration) if args.whisper == 'stub' else None
+        translator = VideoTranslator(
+            base_dir=base_dir,
+            use_cache=False,  # every run starts cold so results stay comparable
+            model_registry=registry,
+            model_size='base' if args.whisper == 'stub' else args.whisper,
+            translation_backend=LocalTranslationBackend(latency=args.translate_latency),
+            tts_backend=LocalTTSBackend(ffmpeg.get_ffmpeg_exe()),
+        )
+        start = time.perf_counter()
+        results = translator.process_video_multi(video_path, args.languages)
+        wall_time = time.perf_counter() - start
+
+    failed = {lang: result.error_message for lang, result in results.items() if not result.success}
+    if failed:
+        raise SystemExit(f"Pipeline failed: {failed}")
+    return {
+        'wall_time': wall_time,
+        'throughput': args.duration * len(args.languages) / wall_time,
+        'peak_rss_bytes': peak_rss_bytes(),
+        'languages': {lang: result.metrics.to_dict()['stages'] for lang, result in results.items()},
+    }
+
+
+def summarize(runs: list) -> dict:
+    return {
+        'wall_time': statistics.median(run['wall_time'] for run in runs),
+        'throughput': statistics.median(run['throughput'] for run in runs),
+        'peak_rss_bytes': max(run['peak_rss_bytes'] or 0 for run in runs),
+    }
+
+
+def compare(summary: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for key in ('wall_time', 'peak_rss_bytes'):
+        old, new = baseline.get(key), summary.get(key)
+        if old and new and new > old * (1 + tolerance):
+            regressions.append(f"{key}: {old:.3f} -> {new:.3f} (+{(new / old - 1):.0%})")
+    old, new = baseline.get('throughput'), summary.get('throughput')
+    if old and new and new < old * (1 - tolerance):
+        regressions.append(f"throughput: {old:.3f} -> {new:.3f} ({(new / old - 1):.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=60.0, help='synthetic video length in seconds')
+    parser.add_argument('--languages', nargs='+', default=['hi'])
+    parser.add_argument('--whisper', default='stub', help="'stub' or a Whisper model size such as tiny")
+    parser.add_argument('--translate-latency', type=float, default=0.0)
+    parser.add_argument('--runs', type=int, default=1)
+    parser.add_argument('--output', help='write the JSON report here')
+    parser.add_argument('--baseline', help='earlier JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative regression')
+    args = parser.parse_args()
+
+    video_path = make_test_video(args.duration)
+    runs = [run_once(video_path, args) for _ in range(args.runs)]
+    report = {
+        'config': {'duration': args.duration, 'languages': args.languages, 'whisper': args.whisper,
+                   'translate_latency': args.translate_latency},
+        'summary': summarize(runs),
+        'runs': runs,
+    }
+
+    summary = report['summary']
+    print(f"{args.duration:.0f}s video x {len(args.languages)} language(s), whisper={args.whisper}")
+    print(f"wall {summary['wall_time']:.2f}s  throughput {summary['throughput']:.1f} media-s/s  "
+          f"peak RSS {summary['peak_rss_bytes'] / 1024 ** 2:.0f} MiB")
+    for stage, m in runs[-1]['languages'][args.languages[0]].items():
+        print(f"  {stage:<11} wall {m['wall_time']:.2f}s  cpu {m['cpu_time']:.2f}s  "
+              f"subprocess {m['subprocess_time']:.2f}s  io {m['read_bytes'] // 1024}/{m['write_bytes'] // 1024} KiB")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(summary, json.load(f)['summary'], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Time term protection and restoration over a synthetic 2-hour transcript.
+
+The legacy path is the old per-term re.sub loop from _replace_with_placeholders
+and translate_text; the new path is the prebuilt TermMatcher.
+
+    python benchmarks/bench_term_matcher.py --minutes 120 --runs 3
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from terms import terms_to_preserve
+from term_matcher import default_matcher, placeholder_for
+
+WORDS_PER_MINUTE = 150
+FILLER = ("so now we will look at how the we take each of these and then we can see that "
+          "this is the first one when you have a look here it is going to be").split()
+
+
+def make_transcript(minutes: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = []
+    for _ in range(minutes * WORDS_PER_MINUTE):
+        words.append(rng.choice(terms_to_preserve) if rng.random() < 0.2 else rng.choice(FILLER))
+        if rng.random() < 0.08:
+            words[-1] += '.'
+    return ' '.join(words)
+
+
+def legacy_round_trip(text: str, lang: str) -> str:
+    placeholders = {}
+    for i, term in enumerate(terms_to_preserve):
+        placeholder = placeholder_for(i, lang)
+        try:
+            text = re.sub(rf'\b{term}\b', placeholder, text, flags=re.IGNORECASE)
+        except re.error:
+            continue
+        placeholders[placeholder] = term
+    for placeholder, term in placeholders.items():
+        text = re.sub(placeholder, term, text, flags=re.IGNORECASE)
+    return text
+
+
+def matcher_round_trip(text: str, lang: str) -> str:
+    protected, _ = default_matcher.protect(text, lang)
+    return default_matcher.restore(protected)
+
+
+def bench(fn, text: str, lang: str, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(text, lang)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--minutes', type=int, default=120)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--lang', default='hi')
+    args = parser.parse_args()
+
+    text = make_transcript(args.minutes)
+    protected, placeholders = default_matcher.protect(text, args.lang)
+    print(f"transcript: {args.minutes} min, {len(text.split())} words, {len(text)} chars")
+    print(f"terms: {len(terms_to_preserve)} listed, {len(default_matcher.terms)} unique, "
+          f"{len(placeholders)} distinct matched")
+
+    legacy = bench(legacy_round_trip, text, args.lang, args.runs)
+    matcher = bench(matcher_round_trip, text, args.lang, args.runs)
+    print(f"legacy   median {statistics.median(legacy):.3f}s")
+    print(f"matcher  median {statistics.median(matcher):.3f}s")
+    print(f"speedup {statistics.median(legacy) / statistics.median(matcher):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
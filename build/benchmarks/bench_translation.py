@@ -0,0 +1,52 @@
+"""Measure translation throughput offline with the local backend.
+
+Compares the old one-chunk-at-a-time loop with the concurrent
+TranslationService, cold and with a warm segment cache. The local backend
+sleeps for --latency seconds per request to stand in for a round trip.
+
+    python benchmarks/bench_translation.py --minutes 120 --latency 0.3 --workers 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import ArtifactCache
+from translation import LocalTranslationBackend, TranslationService, split_sentences
+from bench_term_matcher import make_transcript
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--minutes', type=int, default=120)
+    parser.add_argument('--latency', type=float, default=0.3)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--max-chars', type=int, default=1000)
+    parser.add_argument('--lang', default='hi')
+    args = parser.parse_args()
+
+    chunks = split_sentences(make_transcript(args.minutes), max_chars=args.max_chars)
+    backend = LocalTranslationBackend(latency=args.latency)
+    print(f"{len(chunks)} chunks of <= {args.max_chars} chars, {args.latency:.2f}s simulated latency")
+
+    sequential = TranslationService(backend, max_workers=1)
+    print(f"sequential          {timed(lambda: sequential.translate_chunks(chunks, args.lang)):.2f}s")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ArtifactCache(cache_dir)
+        concurrent = TranslationService(backend, cache=cache, max_workers=args.workers)
+        print(f"concurrent (cold)   {timed(lambda: concurrent.translate_chunks(chunks, args.lang)):.2f}s")
+        print(f"concurrent (cached) {timed(lambda: concurrent.translate_chunks(chunks, args.lang)):.2f}s")
+
+
+if __name__ == '__main__':
+    main()
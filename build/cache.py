@@ -0,0 +1,347 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3  # 5 GB
+INDEX_FLUSH_INTERVAL = 2.0  # seconds between index rewrites during bursts of small entries
+INDEX_FILE = 'index.json'
+LOCK_FILE = 'lock'
+VALUE_FILE = 'value.json'
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def hash_terms(terms: list) -> str:
+    return hash_text("\n".join(terms))[:16]
+
+
+class CacheLockedError(RuntimeError):
+    """Raised when another ArtifactCache, in this process or another, already has the root open."""
+
+
+def _try_lock(handle) -> bool:
+    # OS-level locks are dropped automatically if the holding process dies
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+class ArtifactCache:
+    """Persistent, content-addressed store for pipeline stage outputs.
+
+    Entries are keyed by video ID, stage name and the parameters that affect
+    the stage output. Each entry is a directory of files plus optional JSON
+    metadata, tracked in an on-disk index and evicted least-recently-used
+    once the cache grows past ``max_bytes``. Entries pinned by ``get`` or
+    ``put`` with ``pin=True`` are never evicted until ``release`` is called,
+    so callers can keep using the returned paths. Entries and the index are
+    written to a temporary location first and moved into place, so a crash
+    never leaves a half-written entry behind. Index updates are batched for
+    up to ``INDEX_FLUSH_INTERVAL`` seconds.
+
+    Pins and the batched index live in memory, so only one instance may
+    have a root open at a time: a second one raises CacheLockedError. Code
+    in one process shares an instance through ``get_artifact_cache``.
+    Since no other writer can be active, entry directories the index never
+    recorded are leftovers of a crash and are removed on start.
+    """
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock_handle = open(os.path.join(root, LOCK_FILE), 'a+')
+        if not _try_lock(self._lock_handle):
+            self._lock_handle.close()
+            raise CacheLockedError(f"Cache at {root} is already open; share it through get_artifact_cache()")
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._last_save = 0.0
+        self._pins: Dict[str, int] = {}
+        self._objects_dir = os.path.join(root, 'objects')
+        self._tmp_dir = os.path.join(root, 'tmp')
+        os.makedirs(self._objects_dir, exist_ok=True)
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        self._index_path = os.path.join(root, INDEX_FILE)
+        self._index = self._load_index()
+        self._remove_orphans()
+        _live_caches.add(self)
+
+    @staticmethod
+    def make_key(video_id: str, stage: str, **params) -> str:
+        payload = json.dumps({'video_id': video_id, 'stage': stage, 'params': params}, sort_keys=True)
+        return hash_text(payload)
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self._objects_dir, key[:2], key)
+
+    def _read_index(self) -> Dict:
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Cache index unreadable, ignoring it: {str(e)}")
+            return {}
+
+    def _load_index(self) -> Dict:
+        # Drop entries whose directory vanished underneath us
+        return {key: entry for key, entry in self._read_index().items() if os.path.isdir(self._entry_dir(key))}
+
+    def _remove_orphans(self):
+        for parent in (self._tmp_dir, *(os.path.join(self._objects_dir, p) for p in os.listdir(self._objects_dir))):
+            if not os.path.isdir(parent):
+                continue
+            for name in os.listdir(parent):
+                path = os.path.join(parent, name)
+                if parent != self._tmp_dir and name in self._index:
+                    continue
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+
+    def _save_index(self, force: bool = False):
+        self._dirty = True
+        if not force and time.monotonic() - self._last_save < INDEX_FLUSH_INTERVAL:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir, suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def flush(self):
+        """Write any batched index updates to disk."""
+        with self._lock:
+            # The whole cache may have been deleted meanwhile, e.g. a temporary base_dir
+            if self._dirty and os.path.isdir(self._tmp_dir):
+                self._save_index(force=True)
+
+    def close(self):
+        """Flush the index and give up the root so another instance may open it."""
+        with self._lock:
+            self.flush()
+            self._lock_handle.close()
+        with _shared_caches_lock:
+            if _shared_caches.get(os.path.realpath(self.root)) is self:
+                del _shared_caches[os.path.realpath(self.root)]
+
+    def get(self, key: str, pin: bool = False) -> Optional[Dict]:
+        """Return ``{'files': {name: path}, 'meta': {...}}`` for a cached entry, or None.
+
+        The paths may be evicted by later ``put`` calls unless ``pin`` is set,
+        in which case the caller must ``release`` the key when done with them.
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            entry_dir = self._entry_dir(key)
+            files = {name: os.path.join(entry_dir, name) for name in entry['files']}
+            if not all(os.path.exists(path) for path in files.values()):
+                logging.warning(f"Cache entry {key[:12]} is incomplete, discarding it")
+                self._remove(key)
+                self._save_index()
+                return None
+            entry['last_access'] = time.time()
+            if pin:
+                self._pins[key] = self._pins.get(key, 0) + 1
+            self._save_index()
+            logging.info(f"Cache hit for {entry.get('stage', 'artifact')} ({key[:12]})")
+            return {'files': files, 'meta': entry.get('meta', {})}
+
+    def release(self, key: str):
+        """Undo one ``pin`` of ``key``, making it evictable again once no pins remain."""
+        with self._lock:
+            count = self._pins.get(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+            else:
+                self._pins.pop(key, None)
+
+    @contextmanager
+    def checkout(self, key: str):
+        """Pin an entry for the duration of a ``with`` block; yields None on a miss."""
+        entry = self.get(key, pin=True)
+        try:
+            yield entry
+        finally:
+            if entry is not None:
+                self.release(key)
+
+    def export(self, key: str, name: str, dest: str, link: bool = False) -> Optional[str]:
+        """Copy one file of an entry to ``dest``, a path the caller owns, and return it.
+
+        ``link`` hard-links instead where possible; only use it for paths
+        nothing will write to in place, or the cached copy changes with them.
+        """
+        with self.checkout(key) as entry:
+            if entry is None or name not in entry['files']:
+                return None
+            src = entry['files'][name]
+            tmp_path = f"{dest}.{uuid.uuid4().hex[:8]}.tmp"
+            if link:
+                try:
+                    os.link(src, tmp_path)
+                except OSError:
+                    link = False  # different filesystems, or no hard-link support
+            if not link:
+                shutil.copyfile(src, tmp_path)
+            os.replace(tmp_path, dest)
+        return dest
+
+    def put(self, key: str, files: Optional[Dict[str, str]] = None, meta: Optional[Dict] = None,
+            stage: str = '', value=None, move: bool = False, pin: bool = False) -> Dict:
+        """Store ``files`` (name -> source path) in the cache and return the new entry.
+
+        Files are copied, or moved in when ``move`` is set so large media is
+        not kept twice; callers that move must use the returned paths. With
+        ``pin`` the entry is pinned as in ``get``. ``meta`` is kept in the
+        index and should stay small; larger JSON payloads go in ``value`` and
+        are stored as a file in the entry.
+        """
+        files = dict(files or {})
+        staging = tempfile.mkdtemp(dir=self._tmp_dir)
+        moved = []
+        try:
+            size = 0
+            for name, src in files.items():
+                dst = os.path.join(staging, name)
+                if move:
+                    shutil.move(src, dst)
+                    moved.append((dst, src))
+                else:
+                    shutil.copyfile(src, dst)
+                size += os.path.getsize(dst)
+            if value is not None:
+                value_path = os.path.join(staging, VALUE_FILE)
+                with open(value_path, 'w', encoding='utf-8') as f:
+                    json.dump(value, f, ensure_ascii=False)
+                size += os.path.getsize(value_path)
+                files[VALUE_FILE] = value_path
+            with self._lock:
+                entry_dir = self._entry_dir(key)
+                if key in self._index and self._pins.get(key):
+                    # Someone is reading the existing copy; keep it and drop ours
+                    existing = self._index[key]
+                    files = dict.fromkeys(existing['files'])
+                    meta, size = existing.get('meta', {}), existing['size']
+                else:
+                    if os.path.isdir(entry_dir):
+                        self._remove(key)
+                    os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+                    os.replace(staging, entry_dir)
+                    self._index[key] = {
+                        'stage': stage,
+                        'files': sorted(files),
+                        'meta': meta or {},
+                        'size': size,
+                        'last_access': time.time(),
+                    }
+                moved = []
+                if pin:
+                    self._pins[key] = self._pins.get(key, 0) + 1
+                self._evict(protect=key)
+                self._save_index()
+        except BaseException:
+            # Give moved files back so the caller can still use them
+            for dst, src in moved:
+                if os.path.exists(dst):
+                    shutil.move(dst, src)
+            raise
+        finally:
+            if os.path.isdir(staging):
+                shutil.rmtree(staging, ignore_errors=True)
+        logging.info(f"Cached {stage or 'artifact'} ({key[:12]}, {size} bytes)")
+        return {'files': {name: os.path.join(entry_dir, name) for name in files}, 'meta': meta or {}}
+
+    def get_json(self, key: str):
+        with self.checkout(key) as entry:
+            if entry is None or VALUE_FILE not in entry['files']:
+                return None
+            with open(entry['files'][VALUE_FILE], 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+    def put_json(self, key: str, value, stage: str = ''):
+        self.put(key, stage=stage, value=value)
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(entry['size'] for entry in self._index.values())
+
+    def _remove(self, key: str):
+        self._index.pop(key, None)
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def _evict(self, protect: Optional[str] = None):
+        total = sum(entry['size'] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            if key == protect or self._pins.get(key):
+                continue
+            total -= entry['size']
+            self._remove(key)
+            logging.info(f"Evicted cached {entry.get('stage', 'artifact')} ({key[:12]})")
+
+    def clear(self):
+        with self._lock:
+            for key in [key for key in self._index if not self._pins.get(key)]:
+                self._remove(key)
+            self._save_index(force=True)
+
+
+# Flush every cache still alive at exit without keeping them alive until then
+_live_caches = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_caches():
+    for cache in list(_live_caches):
+        cache.flush()
+
+
+_shared_caches: Dict[str, ArtifactCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_artifact_cache(root: str, max_bytes: int = DEFAULT_MAX_BYTES) -> ArtifactCache:
+    """Return this process's cache for ``root``, opening it on first use.
+
+    ``max_bytes`` only applies when the cache is first opened.
+    """
+    key = os.path.realpath(root)
+    with _shared_caches_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = _shared_caches[key] = ArtifactCache(root, max_bytes=max_bytes)
+        return cache
@@ -0,0 +1,113 @@
+import logging
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from typing import Iterator
+import numpy as np
+
+
+SAMPLE_RATE = 16000  # Whisper expects 16 kHz mono float32
+ENERGY_FRAME_SECONDS = 0.1
+
+
+@dataclass
+class AudioChunk:
+    index: int
+    start: float      # absolute time of the first sample, in seconds
+    keep_from: float  # segments starting before this belong to the previous chunk
+    samples: np.ndarray
+
+    @property
+    def end(self) -> float:
+        return self.start + len(self.samples) / SAMPLE_RATE
+
+
+def _quietest_cut(samples: np.ndarray, lo: int, hi: int) -> int:
+    """Return the sample index of the lowest-energy frame between lo and hi."""
+    frame = int(ENERGY_FRAME_SECONDS * SAMPLE_RATE)
+    window = samples[lo:hi]
+    n_frames = len(window) // frame
+    if n_frames < 2:
+        return hi
+    energy = np.square(window[:n_frames * frame].reshape(n_frames, frame)).mean(axis=1)
+    # Prefer the latest of equally quiet frames so chunks stay close to full size
+    best = n_frames - 1 - int(np.argmin(energy[::-1]))
+    return lo + best * frame + frame // 2
+
+
+def stream_audio_chunks(ffmpeg_path: str, file_path: str, chunk_seconds: float = 600,
+                        overlap_seconds: float = 2.0, search_seconds: float = 10.0) -> Iterator[AudioChunk]:
+    """Decode audio through ffmpeg and yield it in bounded in-memory windows.
+
+    Each chunk is cut at the quietest point within the last ``search_seconds``
+    of its window so words are not split, and starts ``overlap_seconds``
+    before the previous cut so Whisper has some context at the boundary.
+    Only one window of samples is held at a time, however long the input is.
+    """
+    chunk_len = int(chunk_seconds * SAMPLE_RATE)
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    search = min(int(search_seconds * SAMPLE_RATE), chunk_len // 2)
+    if overlap >= chunk_len - search:
+        raise ValueError("overlap_seconds must be shorter than chunk_seconds - search_seconds")
+
+    command = [
+        ffmpeg_path, '-nostdin', '-loglevel', 'error', '-threads', '0',
+        '-i', file_path,
+        '-f', 'f32le', '-ac', '1', '-ar', str(SAMPLE_RATE), '-'
+    ]
+    # stderr goes to a file: a damaged input can log more than a pipe buffer
+    # holds while we are still reading stdout, which would stall both sides
+    stderr_file = tempfile.TemporaryFile()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file)
+    buffer = np.zeros(0, dtype=np.float32)
+    buffer_start = 0  # absolute sample offset of buffer[0]
+    keep_from = 0
+    index = 0
+    try:
+        eof = False
+        while not eof:
+            needed = (chunk_len - len(buffer)) * 4
+            data = process.stdout.read(needed) if needed > 0 else b''
+            if needed > 0 and len(data) < needed:
+                eof = True
+            if data:
+                usable = len(data) - len(data) % 4
+                buffer = np.concatenate([buffer, np.frombuffer(data[:usable], dtype=np.float32)])
+            if eof and buffer_start + len(buffer) <= keep_from:
+                break  # only the overlap tail of the previous chunk is left
+
+            cut = len(buffer) if eof else _quietest_cut(buffer, chunk_len - search, chunk_len)
+            yield AudioChunk(
+                index=index,
+                start=buffer_start / SAMPLE_RATE,
+                keep_from=keep_from / SAMPLE_RATE,
+                samples=buffer[:cut].copy(),
+            )
+            index += 1
+            keep_from = buffer_start + cut
+            next_start = max(cut - overlap, 0)
+            buffer = buffer[next_start:]
+            buffer_start += next_start
+            if eof:
+                break
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode(errors='replace')
+        stderr_file.close()
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg failed to decode {file_path}: {stderr.strip()}")
+    logging.info(f"Decoded {index} chunks from {file_path}")
+
+
+def stitch_segments(chunk: AudioChunk, result: dict) -> list:
+    """Shift a chunk's Whisper segments to absolute time and drop overlap duplicates."""
+    segments = []
+    for segment in result.get('segments', []):
+        start = chunk.start + segment['start']
+        end = chunk.start + segment['end']
+        if (start + end) / 2 < chunk.keep_from:
+            continue
+        segments.append({'start': start, 'end': end, 'text': segment['text'].strip()})
+    return segments
@@ -1,20 +1,28 @@
 import os
 import subprocess
-import whisper
-from deep_translator import GoogleTranslator
-from gtts import gTTS
-import re
-import textwrap
 import imageio_ffmpeg as ffmpeg
 from terms import terms_to_preserve
-from dataclasses import dataclass
-from typing import Optional, Dict
+from term_matcher import get_matcher
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Dict, List, Tuple
 import logging
-from pydub.utils import mediainfo
-from pydub import AudioSegment
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from chunker import AudioChunk, stream_audio_chunks, stitch_segments
+from model_registry import ModelRegistry, get_model_registry, DEFAULT_MODEL_SIZE
+from cache import ArtifactCache, CacheLockedError, DEFAULT_MAX_BYTES, get_artifact_cache, hash_terms
+from translation import TranslationBackend, GoogleTranslationBackend, TranslationService, split_sentences
+from tts import TTSBackend, GTTSBackend, CachedTTSBackend
+from dubbing import DubSegment, SegmentDubber, merge_segments, atempo_chain
+from media import MediaIO
+from progress import PipelineCancelled, PipelineRun, ProgressCallback, StageLimiter
+from metrics import PipelineMetrics, carrying_metrics, collecting, instrumented
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 # import whisper
-# from pydub.utils import mediainfo
 # Set up logging
 
 
@@ -23,15 +31,21 @@ os.environ["PATH"] += os.pathsep + r"C:\Users\ramud\Desktop\COADING APPS\ffmeg\f
 
 
 
+# Full detail goes to the log file; the console only shows warnings and errors
+_console_handler = logging.StreamHandler()
+_console_handler.setLevel(logging.WARNING)
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=os.environ.get('VIDEO_TRANSLATOR_LOG_LEVEL', 'INFO').upper(),
     format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
         logging.FileHandler('video_translator.log'),
-        logging.StreamHandler()
+        _console_handler
     ]
 )
 
+# Audio at least this long is decoded and transcribed in chunks
+LONG_AUDIO_SECONDS = 900
+
 @dataclass
 class TranslationResult:
     video_title: str
@@ -42,11 +56,41 @@ class TranslationResult:
     translated_audio_path: str
     success: bool
     error_message: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    metrics: Optional[PipelineMetrics] = None
+
+@dataclass
+class SourceMedia:
+    video_id: str
+    video_title: str
+    audio_path: str
+    video_path: str
+    transcription: Dict
+    cache_pins: List[str] = field(default_factory=list)  # cache keys to release once every language is done
 
 class VideoTranslator:
-    def __init__(self, base_dir: str = None):
+    def __init__(self, base_dir: str = None, model_registry: Optional[ModelRegistry] = None,
+                 model_size: str = DEFAULT_MODEL_SIZE, device: Optional[str] = None,
+                 chunk_seconds: float = 600, chunk_overlap: float = 2.0, transcribe_workers: int = 1,
+                 use_cache: bool = True, cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                 language_workers: int = 4, translation_backend: Optional[TranslationBackend] = None,
+                 translate_workers: int = 4, tts_backend: Optional[TTSBackend] = None,
+                 tts_workers: int = 4, stage_limiter: Optional[StageLimiter] = None,
+                 trace_dir: Optional[str] = None):
         self.base_dir = base_dir or os.path.dirname(os.path.abspath(__file__))
         self.ffmpeg_path = ffmpeg.get_ffmpeg_exe()
+        self.media = MediaIO(self.ffmpeg_path)
+        self.model_registry = model_registry or get_model_registry()
+        self.model_size = model_size
+        self.device = device
+        self.chunk_seconds = chunk_seconds
+        self.chunk_overlap = chunk_overlap
+        self.transcribe_workers = max(1, transcribe_workers)
+        self.language_workers = max(1, language_workers)
+        self.stage_limiter = stage_limiter or StageLimiter({})
+        self.trace_dir = trace_dir
+        self._source_locks: Dict[str, threading.Lock] = {}
+        self._source_locks_guard = threading.Lock()
         
         # Define directories with absolute paths
         self.directories = {
@@ -54,9 +98,22 @@ class VideoTranslator:
             'translated_audio': os.path.join(self.base_dir, 'T_audio'),
             'translated_text': os.path.join(self.base_dir, 'translated_text'),
             'video': os.path.join(self.base_dir, 'video'),
-            'output_video': os.path.join(self.base_dir, 'output_video')
+            'output_video': os.path.join(self.base_dir, 'output_video'),
+            'cache': os.path.join(self.base_dir, 'cache')
         }
         self._create_directories()
+        self.cache = None
+        if use_cache:
+            try:
+                self.cache = get_artifact_cache(self.directories['cache'], max_bytes=cache_max_bytes)
+            except CacheLockedError as e:
+                # Another process (e.g. a second server) owns this cache directory
+                logging.warning(f"{str(e)}; running without the artifact cache")
+        self.translation_backend = translation_backend or GoogleTranslationBackend()
+        self.translation_service = TranslationService(self.translation_backend, cache=self.cache,
+                                                      max_workers=translate_workers)
+        self.tts_backend = CachedTTSBackend(tts_backend or GTTSBackend(), self.cache)
+        self.dubber = SegmentDubber(self.ffmpeg_path, self.tts_backend, self.get_duration, max_workers=tts_workers)
         logging.info(f"Initialized VideoTranslator with base directory: {self.base_dir}")
 
     def _create_directories(self):
@@ -75,144 +132,123 @@ class VideoTranslator:
         logging.info(f"{description} found at: {file_path}")
         return True
 
-    def _sanitize_filename(self, filename: str) -> str:
-        # Remove or replace invalid characters
-        filename = re.sub(r'[\\/*?:"<>|]', '', filename)
-        # Replace spaces with underscores
-        filename = re.sub(r'\s+', '_', filename)
-        return filename
+    def _cache_get(self, key: str, pin: bool = False) -> Optional[Dict]:
+        return self.cache.get(key, pin=pin) if self.cache else None
 
-    def get_video_title(self, youtube_url: str) -> str:
-        try:
-            result = subprocess.run(
-                ['yt-dlp', '--get-title', youtube_url],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            title = result.stdout.strip()
-            sanitized_title = self._sanitize_filename(title)
-            logging.info(f"Retrieved video title: {sanitized_title}")
-            return sanitized_title
-        except Exception as e:
-            logging.error(f"Failed to get video title: {str(e)}")
-            return "untitled_video"
+    def _cache_get_json(self, key: str):
+        return self.cache.get_json(key) if self.cache else None
 
-    def download_audio_and_video(self, youtube_url: str, audio_filename: str, video_filename: str) -> bool:
+    def _cache_put(self, key: str, stage: str, files: Optional[Dict[str, str]] = None,
+                   meta: Optional[Dict] = None, value=None, move: bool = False,
+                   pin: bool = False) -> Optional[Dict]:
+        if not self.cache:
+            return None
         try:
-            logging.info(f"Downloading from URL: {youtube_url}")
-            logging.info(f"Audio output path: {audio_filename}")
-            logging.info(f"Video output path: {video_filename}")
-
-            # Download audio
-            audio_command = [
-                'yt-dlp',
-                '--extract-audio',
-                '--audio-format', 'mp3',
-                youtube_url,
-                '-o', audio_filename
-            ]
-            
-            # Download video
-            video_command = [
-                'yt-dlp',
-                youtube_url,
-                '-o', video_filename
-            ]
-
-            # Execute commands
-            subprocess.run(audio_command, check=True, capture_output=True, text=True)
-            subprocess.run(video_command, check=True, capture_output=True, text=True)
-
-            # Verify files were created
-            audio_exists = self._verify_file_exists(audio_filename, "Audio file")
-            video_exists = self._verify_file_exists(video_filename, "Video file")
-
-            return audio_exists and video_exists
-
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Download failed with error: {e.stderr}")
-            return False
+            return self.cache.put(key, files=files, meta=meta, stage=stage, value=value, move=move, pin=pin)
         except Exception as e:
-            logging.error(f"Unexpected error during download: {str(e)}")
-            return False
-
-
+            # A full disk or similar should not fail the job that produced the artifact
+            logging.warning(f"Failed to cache {stage} output: {str(e)}")
+            return None
 
-    def transcribe_audio(self, file_path: str) -> str:
+    def _source_lock(self, video_id: str) -> threading.Lock:
+        # Jobs for the same video wait for one fetch instead of racing on its files
+        with self._source_locks_guard:
+            return self._source_locks.setdefault(video_id, threading.Lock())
+
+    def _release_source(self, source: Optional['SourceMedia']):
+        if source is not None and self.cache:
+            for key in source.cache_pins:
+                self.cache.release(key)
+
+    @instrumented
+    def transcribe_audio(self, file_path: str, model_size: Optional[str] = None, device: Optional[str] = None) -> str:
+        return self.transcribe(file_path, model_size, device)['text']
+
+    @instrumented
+    def transcribe(self, file_path: str, model_size: Optional[str] = None, device: Optional[str] = None,
+                   progress: Optional[Callable[[float], None]] = None) -> Dict:
+        """Transcribe audio and return Whisper's text plus absolute-time segments.
+
+        ``progress`` is called with the fraction of audio transcribed so far.
+        """
+        model_size = model_size or self.model_size
+        device = device or self.device
         try:
             # Verify if the file exists
             if not self._verify_file_exists(file_path, "Audio file for transcription"):
                 raise FileNotFoundError(f"Audio file not found: {file_path}")
 
-            # Get audio information using mediainfo
-            audio_info = mediainfo(file_path)
-
             # Extract the length of the audio file in seconds
-            audio_length = float(audio_info['duration'])
+            audio_length = self.media.duration(file_path)
+            if audio_length is None:
+                raise ValueError(f"Could not read duration of {file_path}")
             logging.info(f"Audio length: {audio_length} seconds")
 
             # If the audio length is greater than or equal to 900 seconds (15 minutes)
-            if audio_length >= 900:
-                logging.info(f"Audio is too long, splitting it into 10-minute parts.")
-
-                # Load the audio file using pydub
-                audio = AudioSegment.from_file(file_path)
-
-                # Define the chunk size (10 minutes = 600,000 ms)
-                chunk_size = 10 * 60 * 1000  # 10 minutes in milliseconds
-                chunks = []
-
-                # Split the audio into chunks
-                for start_ms in range(0, len(audio), chunk_size):
-                    chunk = audio[start_ms:start_ms + chunk_size]
-                    chunk_file_path = f"temp_chunk_{start_ms // chunk_size + 1}.wav"
-                    chunk.export(chunk_file_path, format="wav")
-                    chunks.append(chunk_file_path)
-                    logging.info(f"Exported chunk: {chunk_file_path}")
-
-                # Now transcribe each chunk
-                model = whisper.load_model("base")
-                transcriptions = []
-
-                for chunk_file in chunks:
-                    logging.info(f"Transcribing chunk: {chunk_file}")
-                    result = model.transcribe(chunk_file)
-                    transcriptions.append(result['text'])
-                    logging.info(f"Transcription for chunk completed")
-
-                # Combine all transcriptions
-                full_transcription = " ".join(transcriptions)
-                logging.info("Transcription completed successfully for all chunks.")
-                return full_transcription
+            if audio_length >= LONG_AUDIO_SECONDS:
+                logging.info(f"Audio is too long, transcribing in {self.chunk_seconds:.0f}-second chunks "
+                             f"on {self.transcribe_workers} worker(s).")
+                return self._transcribe_chunked(file_path, model_size, device, audio_length, progress)
 
             # If audio length is less than 900 seconds, transcribe directly
             else:
                 logging.info(f"Audio length is within limits, transcribing directly.")
-                model = whisper.load_model("base")
-                result = model.transcribe(file_path)
+                with self.model_registry.lease(model_size, device) as model:
+                    result = model.transcribe(file_path)
                 logging.info("Transcription completed successfully")
-                return result['text']
+                segments = [
+                    {'start': seg['start'], 'end': seg['end'], 'text': seg['text'].strip()}
+                    for seg in result.get('segments', [])
+                ]
+                return {'text': result['text'], 'segments': segments}
 
         except Exception as e:
             logging.error(f"Transcription failed: {str(e)}")
             raise
 
+    def _transcribe_chunked(self, file_path: str, model_size: str, device: Optional[str],
+                            audio_length: float, progress: Optional[Callable[[float], None]]) -> Dict:
+        def transcribe_chunk(chunk: AudioChunk) -> Tuple[float, list]:
+            logging.info(f"Transcribing chunk {chunk.index + 1} ({chunk.start:.1f}s - {chunk.end:.1f}s)")
+            with self.model_registry.lease(model_size, device, max_replicas=self.transcribe_workers) as model:
+                result = model.transcribe(chunk.samples)
+            logging.info(f"Transcription for chunk {chunk.index + 1} completed")
+            return chunk.end, stitch_segments(chunk, result)
+
+        # Keep at most one decoded chunk queued per worker so memory stays flat
+        segments_by_chunk = {}
+        pending = deque()
+        transcribe_chunk = carrying_metrics(transcribe_chunk)
+        with ThreadPoolExecutor(max_workers=self.transcribe_workers) as pool:
+            chunks = stream_audio_chunks(self.ffmpeg_path, file_path,
+                                         chunk_seconds=self.chunk_seconds,
+                                         overlap_seconds=self.chunk_overlap)
+            for chunk in chunks:
+                pending.append((chunk.index, pool.submit(transcribe_chunk, chunk)))
+                del chunk
+                while len(pending) > self.transcribe_workers:
+                    index, future = pending.popleft()
+                    chunk_end, segments_by_chunk[index] = future.result()
+                    if progress:
+                        progress(chunk_end / audio_length)
+            for index, future in pending:
+                chunk_end, segments_by_chunk[index] = future.result()
+                if progress:
+                    progress(chunk_end / audio_length)
+
+        segments = [seg for index in sorted(segments_by_chunk) for seg in segments_by_chunk[index]]
+        logging.info("Transcription completed successfully for all chunks.")
+        return {'text': " ".join(seg['text'] for seg in segments), 'segments': segments}
+
+    @instrumented
     def translate_text(self, text: str, language: str, terms: list) -> str:
         try:
             logging.info(f"Translating text to {language}")
             text_with_placeholders, placeholders = self._replace_with_placeholders(text, terms, language)
-            text_chunks = textwrap.wrap(text_with_placeholders, width=5000, break_long_words=False, replace_whitespace=False)
-            
-            translated_chunks = []
-            for i, chunk in enumerate(text_chunks):
-                logging.info(f"Translating chunk {i+1}/{len(text_chunks)}")
-                translation_chunk = GoogleTranslator(source='auto', target=language).translate(chunk)
-                translated_chunks.append(translation_chunk)
-
-            translated_text = " ".join(translated_chunks)
-            for placeholder, original_term in placeholders.items():
-                translated_text = re.sub(placeholder, original_term, translated_text, flags=re.IGNORECASE)
+            text_chunks = split_sentences(text_with_placeholders)
+            translated_chunks = self.translation_service.translate_chunks(text_chunks, language)
+
+            translated_text = get_matcher(terms).restore(" ".join(translated_chunks))
 
             logging.info("Translation completed successfully")
             return translated_text
@@ -221,141 +257,313 @@ class VideoTranslator:
             logging.error(f"Translation failed: {str(e)}")
             raise
 
+    @instrumented
+    def translate_segments(self, segments: List[Dict], language: str, terms: list) -> List[Dict]:
+        """Translate timed segments, keeping each one's start and end."""
+        try:
+            logging.info(f"Translating {len(segments)} segments to {language}")
+            matcher = get_matcher(terms)
+            protected = [matcher.protect(segment['text'], language)[0] for segment in segments]
+            translated = self.translation_service.translate_lines(protected, language)
+            logging.info("Translation completed successfully")
+            return [
+                {'start': segment['start'], 'end': segment['end'], 'text': matcher.restore(text)}
+                for segment, text in zip(segments, translated)
+            ]
+        except Exception as e:
+            logging.error(f"Translation failed: {str(e)}")
+            raise
+
+    @instrumented
+    def dub_segments(self, segments: List[Dict], lang: str, total_duration: float, output_audio_path: str,
+                     progress: Optional[Callable[[float], None]] = None) -> bool:
+        """Synthesise each segment and fit it into its time slot on one audio track."""
+        try:
+            dub_segments = [DubSegment(seg['start'], seg['end'], seg['text']) for seg in segments if seg['text']]
+            with tempfile.TemporaryDirectory(dir=self.directories['translated_audio']) as work_dir:
+                self.dubber.synthesize(dub_segments, lang, work_dir, progress=progress)
+                self.dubber.fit(dub_segments, total_duration)
+                self.dubber.assemble(dub_segments, total_duration, output_audio_path, work_dir)
+            logging.info(f"Dubbed audio generated successfully: {output_audio_path}")
+            return True
+        except PipelineCancelled:
+            raise
+        except Exception as e:
+            logging.error(f"Dubbing failed: {str(e)}")
+            return False
+
     def _replace_with_placeholders(self, text: str, terms: list, lang: str) -> tuple:
-        placeholders = {}
-        modified_text = text
-        for i, term in enumerate(terms):
-            if lang in ['hi', 'ta', 'ml']:
-                placeholder = f"_term{i}_"
-            elif lang == 'te':
-                placeholder = f"___term{i}___"
-            else:
-                placeholder = f"__term{i}__"
-            pattern = rf'\b{term}\b'
-            modified_text = re.sub(pattern, placeholder, modified_text, flags=re.IGNORECASE)
-            placeholders[placeholder] = term
-        return modified_text, placeholders
+        return get_matcher(terms).protect(text, lang)
 
+    @instrumented
     def text_to_speech(self, text: str, lang: str, audio_filename: str) -> bool:
         try:
             logging.info(f"Generating speech in {lang}")
-            tts = gTTS(text=text, lang=lang)
-            tts.save(audio_filename)
+            self.tts_backend.backend.synthesize(text, lang, audio_filename)
             logging.info(f"Speech generated successfully: {audio_filename}")
             return True
         except Exception as e:
             logging.error(f"Text-to-speech failed: {str(e)}")
             return False
 
+    @instrumented
     def get_duration(self, file_path: str) -> Optional[float]:
         try:
-            result = subprocess.run(
-                [self.ffmpeg_path, '-i', file_path],
-                stderr=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                text=True
-            )
-            for line in result.stderr.split('\n'):
-                if "Duration" in line:
-                    time_str = line.split("Duration: ")[1].split(",")[0]
-                    h, m, s = map(float, time_str.split(':'))
-                    duration = h * 3600 + m * 60 + s
-                    logging.info(f"Duration of {file_path}: {duration} seconds")
-                    return duration
-            return None
+            duration = self.media.duration(file_path)
+            logging.info(f"Duration of {file_path}: {duration} seconds")
+            return duration
         except Exception as e:
             logging.error(f"Failed to get duration: {str(e)}")
             return None
 
+    @instrumented
     def adjust_audio_speed(self, audio_path: str, speed_factor: float, output_audio_path: str) -> bool:
         try:
             logging.info(f"Adjusting audio speed by factor: {speed_factor}")
             subprocess.run([
-                self.ffmpeg_path, '-i', audio_path,
-                '-filter:a', f"atempo={speed_factor}",
+                self.ffmpeg_path, '-y', '-i', audio_path,
+                '-filter:a', atempo_chain(speed_factor),
                 '-vn', output_audio_path
-            ], check=True)
+            ], check=True, capture_output=True)
             logging.info("Audio speed adjusted successfully")
             return True
         except Exception as e:
             logging.error(f"Failed to adjust audio speed: {str(e)}")
             return False
 
+    @instrumented
     def replace_audio_in_video(self, video_path: str, audio_path: str, output_video_path: str) -> bool:
         try:
             logging.info("Replacing audio in video")
             subprocess.run([
-                self.ffmpeg_path, '-i', video_path,
+                self.ffmpeg_path, '-y', '-i', video_path,
                 '-i', audio_path,
                 '-c:v', 'copy',
                 '-map', '0:v:0',
                 '-map', '1:a:0',
                 output_video_path
-            ], check=True)
+            ], check=True, capture_output=True)
             logging.info("Audio replaced successfully")
             return True
         except Exception as e:
             logging.error(f"Failed to replace audio: {str(e)}")
             return False
 
-    def process_video(self, youtube_url: str, target_language: str) -> TranslationResult:
+    @contextmanager
+    def _stage(self, run: PipelineRun, stage: str):
+        with self.stage_limiter.hold(stage):
+            run.report(stage, 'started', 0.0)
+            start = time.perf_counter()
+            try:
+                with run.metrics.measure(stage):
+                    yield
+            finally:
+                run.timings[stage] = run.timings.get(stage, 0.0) + time.perf_counter() - start
+                logging.info(f"Stage '{stage}' took {run.timings[stage]:.2f} seconds")
+        run.report(stage, 'finished', 1.0)
+
+    def _prepare_source(self, source_url: str, run: PipelineRun) -> Optional[SourceMedia]:
+        """Fetch and transcribe a video once so any number of languages can reuse it."""
+        pins = []
         try:
-            # Get video title
-            video_title = self.get_video_title(youtube_url)
-            logging.info(f"Processing video: {video_title}")
-            
-            # Setup file paths
-            audio_filename = os.path.join(self.directories['input_audio'], f'{video_title}.mp3')
-            video_filename = os.path.join(self.directories['video'], f'{video_title}.webm')
-            translated_audio_path = os.path.join(self.directories['translated_audio'], f'{video_title}_{target_language}.mp3')
-            adjusted_audio_path = os.path.join(self.directories['translated_audio'], f'{video_title}_{target_language}_adjusted.mp3')
-            output_video_path = os.path.join(self.directories['output_video'], f'{video_title}_{target_language}.webm')
-            translated_text_path = os.path.join(self.directories['translated_text'], f'{video_title}_{target_language}.txt')
-
-            # Download video and audio
-            if not self.download_audio_and_video(youtube_url, audio_filename, video_filename):
-                return TranslationResult(video_title, "", "", "", "", "", False, "Failed to download video")
+            return self._load_source(source_url, run, pins)
+        except BaseException:
+            # Cancellation or a failure in any stage: the caller never sees the pins
+            if self.cache:
+                for key in pins:
+                    self.cache.release(key)
+            raise
 
-            # Transcribe audio
-            transcribed_text = self.transcribe_audio(audio_filename)
+    def _load_source(self, source_url: str, run: PipelineRun, pins: List[str]) -> Optional[SourceMedia]:
+        # Cache keys pinned along the way are appended to ``pins`` as soon as they are taken
+        video_id = self.media.source_id(source_url)
+        is_local = self.media.is_local(source_url)
+
+        # Fetch the video and its audio track, or reuse an earlier fetch of the same video.
+        # Cached media stays pinned until every language has been rendered from it.
+        with self._stage(run, 'download'), self._source_lock(video_id):
+            media_key = ArtifactCache.make_key(video_id, 'media')
+            cached = self._cache_get(media_key, pin=True)
+            if cached:
+                pins.append(media_key)
+                video_title = cached['meta']['title']
+                audio_filename = cached['files'][cached['meta']['audio_file']]
+                video_file = cached['meta'].get('video_file')
+                video_filename = cached['files'][video_file] if video_file else os.path.abspath(source_url)
+            else:
+                try:
+                    media = self.media.fetch(source_url, self.directories['video'], self.directories['input_audio'])
+                except subprocess.CalledProcessError as e:
+                    logging.error(f"Download failed with error: {e.stderr}")
+                    return None
+                video_title, audio_filename, video_filename = media.title, media.audio_path, media.video_path
+                # Downloads move into the cache rather than being kept twice; a local
+                # source video is the user's file and stays where it is
+                audio_file = 'audio' + os.path.splitext(audio_filename)[1]
+                files = {audio_file: audio_filename}
+                meta = {'title': video_title, 'audio_file': audio_file}
+                if not is_local:
+                    meta['video_file'] = 'video' + os.path.splitext(video_filename)[1]
+                    files[meta['video_file']] = video_filename
+                entry = self._cache_put(media_key, 'media', files=files, meta=meta, move=True, pin=True)
+                if entry:
+                    pins.append(media_key)
+                    audio_filename = entry['files'][audio_file]
+                    if not is_local:
+                        video_filename = entry['files'][meta['video_file']]
+            logging.info(f"Processing video: {video_title}")
 
-            # Translate text
-            translated_text = self.translate_text(transcribed_text, target_language, terms_to_preserve)
+        # Transcribe audio
+        with self._stage(run, 'transcribe'):
+            transcribe_key = ArtifactCache.make_key(video_id, 'transcribe', model_size=self.model_size)
+            transcription = self._cache_get_json(transcribe_key)
+            if transcription is None:
+                transcription = self.transcribe(audio_filename,
+                                                progress=lambda f: run.report('transcribe', 'progress', f))
+                self._cache_put(transcribe_key, 'transcribe', value=transcription)
+
+        return SourceMedia(video_id, video_title, audio_filename, video_filename, transcription, pins)
+
+    def _render_language(self, source: SourceMedia, target_language: str, run: PipelineRun) -> TranslationResult:
+        """Translate, dub segment by segment and mux one target language."""
+        video_title = source.video_title
+        video_filename = source.video_path
+        transcribed_text = source.transcription['text']
+
+        # Setup file paths
+        dubbed_audio_path = os.path.join(self.directories['translated_audio'], f'{video_title}_{target_language}_adjusted.mp3')
+        video_ext = os.path.splitext(video_filename)[1] or '.webm'
+        output_video_path = os.path.join(self.directories['output_video'], f'{video_title}_{target_language}{video_ext}')
+        translated_text_path = os.path.join(self.directories['translated_text'], f'{video_title}_{target_language}.txt')
+
+        video_duration = self.get_duration(video_filename)
+        if not video_duration:
+            return TranslationResult(video_title, transcribed_text, "", "", "", "", False, "Failed to get media durations", run.timings)
+
+        # Whisper segments give the timeline; a transcript without them becomes one long slot
+        segments = merge_segments(source.transcription.get('segments') or
+                                  [{'start': 0.0, 'end': video_duration, 'text': transcribed_text}])
+
+        # Translate text
+        with self._stage(run, 'translate'):
+            translate_params = dict(model_size=self.model_size, language=target_language,
+                                    terms=hash_terms(terms_to_preserve), backend=self.translation_backend.name)
+            translate_key = ArtifactCache.make_key(source.video_id, 'translate_segments', **translate_params)
+            translated_segments = self._cache_get_json(translate_key)
+            if translated_segments is None:
+                translated_segments = self.translate_segments(segments, target_language, terms_to_preserve)
+                self._cache_put(translate_key, 'translate_segments', value=translated_segments)
+            translated_text = " ".join(seg['text'] for seg in translated_segments)
 
             # Save translated text
             with open(translated_text_path, 'w', encoding='utf-8') as f:
                 f.write(translated_text)
 
-            # Generate speech from translated text
-            if not self.text_to_speech(translated_text, target_language, translated_audio_path):
-                return TranslationResult(video_title, transcribed_text, translated_text, "", translated_text_path, "", False, "Failed to generate speech")
-
-            # Process audio and video
-            video_duration = self.get_duration(video_filename)
-            audio_duration = self.get_duration(translated_audio_path)
-            
-            if not video_duration or not audio_duration:
-                return TranslationResult(video_title, transcribed_text, translated_text, "", translated_text_path, translated_audio_path, False, "Failed to get media durations")
-
-            speed_factor = audio_duration / video_duration
-
-            if not self.adjust_audio_speed(translated_audio_path, speed_factor, adjusted_audio_path):
-                return TranslationResult(video_title, transcribed_text, translated_text, "", translated_text_path, translated_audio_path, False, "Failed to adjust audio speed")
-
-            if not self.replace_audio_in_video(video_filename, adjusted_audio_path, output_video_path):
-                return TranslationResult(video_title, transcribed_text, translated_text, "", translated_text_path, adjusted_audio_path, False, "Failed to create final video")
-
-            return TranslationResult(
-                video_title=video_title,
-                original_text=transcribed_text,
-                translated_text=translated_text,
-                output_video_path=output_video_path,
-                translated_text_path=translated_text_path,
-                translated_audio_path=adjusted_audio_path,
-                success=True
-            )
+        # Synthesise every segment and fit it to its slot on the video timeline
+        with self._stage(run, 'dub'):
+            dub_key = ArtifactCache.make_key(source.video_id, 'dub', tts=self.tts_backend.name, **translate_params)
+            # Copy a cached dub out so later cache writes cannot evict the file being muxed
+            if self.cache and self.cache.export(dub_key, 'dub.mp3', dubbed_audio_path):
+                logging.info(f"Reusing cached dub for {target_language}")
+            elif self.dub_segments(translated_segments, target_language, video_duration, dubbed_audio_path,
+                                   progress=lambda f: run.report('dub', 'progress', f)):
+                self._cache_put(dub_key, 'dub', files={'dub.mp3': dubbed_audio_path})
+            else:
+                return TranslationResult(video_title, transcribed_text, translated_text, "", translated_text_path, "", False, "Failed to generate speech", run.timings)
+
+        with self._stage(run, 'mux'):
+            if not self.replace_audio_in_video(video_filename, dubbed_audio_path, output_video_path):
+                return TranslationResult(video_title, transcribed_text, translated_text, "", translated_text_path, dubbed_audio_path, False, "Failed to create final video", run.timings)
+
+        return TranslationResult(
+            video_title=video_title,
+            original_text=transcribed_text,
+            translated_text=translated_text,
+            output_video_path=output_video_path,
+            translated_text_path=translated_text_path,
+            translated_audio_path=dubbed_audio_path,
+            success=True,
+            timings=run.timings
+        )
+
+    def process_video(self, youtube_url: str, target_language: str,
+                      progress_callback: Optional[ProgressCallback] = None) -> TranslationResult:
+        """Dub a YouTube video, or a local video file, into ``target_language``.
+
+        ``progress_callback`` receives a ProgressEvent as each stage starts,
+        advances and finishes; raising from it aborts the run. The result's
+        ``metrics`` hold per-stage and per-method resource usage.
+        """
+        run = PipelineRun(progress_callback, target_language)
+        source = None
+        with collecting(run.metrics):
+            try:
+                source = self._prepare_source(youtube_url, run)
+                if source is None:
+                    result = TranslationResult("", "", "", "", "", "", False, "Failed to download video", run.timings)
+                else:
+                    result = self._render_language(source, target_language, run)
 
-        except Exception as e:
-            error_msg = f"Error processing video: {str(e)}"
-            logging.error(error_msg)
-            return TranslationResult("", "", "", "", "", "", False, error_msg)
\ No newline at end of file
+            except Exception as e:
+                error_msg = f"Error processing video: {str(e)}"
+                logging.error(error_msg)
+                result = TranslationResult("", "", "", "", "", "", False, error_msg, run.timings)
+            finally:
+                self._release_source(source)
+        return self._attach_metrics(result, run)
+
+    def process_video_multi(self, youtube_url: str, languages: List[str], max_workers: Optional[int] = None,
+                            progress_callback: Optional[ProgressCallback] = None) -> Dict[str, TranslationResult]:
+        """Dub one video into several languages, downloading and transcribing it only once.
+
+        Translation, speech synthesis, retiming and muxing run concurrently per
+        language. Returns one TranslationResult per language; each result's
+        timings include the shared download and transcribe stages.
+        """
+        languages = list(dict.fromkeys(languages))
+        shared_run = PipelineRun(progress_callback)
+        with collecting(shared_run.metrics):
+            try:
+                source = self._prepare_source(youtube_url, shared_run)
+                error_msg = None if source else "Failed to download video"
+            except Exception as e:
+                source, error_msg = None, f"Error processing video: {str(e)}"
+                logging.error(error_msg)
+        if source is None:
+            return {lang: self._attach_metrics(
+                        TranslationResult("", "", "", "", "", "", False, error_msg, dict(shared_run.timings)),
+                        shared_run.for_language(lang))
+                    for lang in languages}
+
+        def render(lang: str) -> TranslationResult:
+            run = shared_run.for_language(lang)
+            with collecting(run.metrics):
+                try:
+                    result = self._render_language(source, lang, run)
+                except Exception as e:
+                    error_msg = f"Error processing video: {str(e)}"
+                    logging.error(f"[{lang}] {error_msg}")
+                    result = TranslationResult(source.video_title, source.transcription['text'], "", "", "", "", False, error_msg, run.timings)
+            return self._attach_metrics(result, run)
+
+        workers = max_workers or self.language_workers
+        results = {}
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(languages) or 1))) as pool:
+                futures = {lang: pool.submit(render, lang) for lang in languages}
+                for lang, future in futures.items():
+                    results[lang] = future.result()
+        finally:
+            self._release_source(source)
+        return results
+
+    def _attach_metrics(self, result: TranslationResult, run: PipelineRun) -> TranslationResult:
+        result.metrics = run.metrics
+        if self.trace_dir:
+            name = f"{result.video_title or 'untitled_video'}_{run.language}_{time.strftime('%Y%m%d-%H%M%S')}.json"
+            try:
+                run.metrics.write_trace(os.path.join(self.trace_dir, name), video_title=result.video_title,
+                                        language=run.language, success=result.success, timings=result.timings)
+            except OSError as e:
+                logging.warning(f"Failed to write metrics trace: {str(e)}")
+        return result
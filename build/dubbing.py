@@ -0,0 +1,149 @@
+import logging
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from tts import TTSBackend
+from metrics import carrying_metrics
+
+
+ATEMPO_MIN = 0.5
+ATEMPO_MAX = 2.0
+SAMPLE_RATE = 24000
+MAX_GRAPH_INPUTS = 400  # keeps the single ffmpeg graph well under open-file limits
+
+
+@dataclass
+class DubSegment:
+    start: float
+    end: float
+    text: str
+    audio_path: Optional[str] = None
+    duration: Optional[float] = None
+    offset: Optional[float] = None  # where the clip is placed on the timeline
+    tempo: float = 1.0
+
+
+def merge_segments(segments: List[dict], min_seconds: float = 6.0, max_gap: float = 1.0,
+                   max_segments: int = MAX_GRAPH_INPUTS) -> List[dict]:
+    """Join short neighbouring Whisper segments into slots worth synthesising on their own.
+
+    Very short clips sound choppy and each one costs a TTS request and a
+    graph input, so segments are merged until they last ``min_seconds``,
+    unless there is a pause longer than ``max_gap`` between them. The
+    threshold grows until at most ``max_segments`` slots remain.
+    """
+    while True:
+        merged = []
+        for segment in segments:
+            text = segment['text'].strip()
+            if not text:
+                continue
+            if merged:
+                last = merged[-1]
+                if last['end'] - last['start'] < min_seconds and segment['start'] - last['end'] <= max_gap:
+                    last['end'] = segment['end']
+                    last['text'] = f"{last['text']} {text}"
+                    continue
+            merged.append({'start': segment['start'], 'end': segment['end'], 'text': text})
+        if len(merged) <= max_segments:
+            return merged
+        min_seconds *= 2
+        max_gap *= 2
+
+
+def atempo_chain(factor: float) -> str:
+    """Express any positive tempo factor as a chain of in-range atempo filters."""
+    filters = []
+    while factor > ATEMPO_MAX:
+        filters.append(f"atempo={ATEMPO_MAX}")
+        factor /= ATEMPO_MAX
+    while factor < ATEMPO_MIN:
+        filters.append(f"atempo={ATEMPO_MIN}")
+        factor /= ATEMPO_MIN
+    if abs(factor - 1.0) > 1e-3 or not filters:
+        filters.append(f"atempo={factor:.4f}")
+    return ",".join(filters)
+
+
+class SegmentDubber:
+    """Synthesises translated segments and lays them onto the original timeline.
+
+    Each clip is sped up just enough to fit before the next segment starts.
+    If a clip still overruns at ``max_tempo``, later clips are pushed back
+    and speed up to recover the drift.
+    """
+
+    def __init__(self, ffmpeg_path: str, tts_backend: TTSBackend, get_duration: Callable[[str], Optional[float]],
+                 max_workers: int = 4, max_tempo: float = 2.0):
+        self.ffmpeg_path = ffmpeg_path
+        self.tts_backend = tts_backend
+        self.get_duration = get_duration
+        self.max_workers = max(1, max_workers)
+        self.max_tempo = max_tempo
+
+    def synthesize(self, segments: List[DubSegment], lang: str, work_dir: str,
+                   progress: Optional[Callable[[float], None]] = None) -> List[DubSegment]:
+        done = []
+        lock = threading.Lock()
+
+        def work(item):
+            index, segment = item
+            out_path = os.path.join(work_dir, f'segment_{index:05d}.{self.tts_backend.extension}')
+            segment.audio_path = self.tts_backend.synthesize(segment.text, lang, out_path)
+            segment.duration = self.get_duration(segment.audio_path)
+            if not segment.duration:
+                raise RuntimeError(f"Could not read duration of synthesised segment {index}")
+            if progress:
+                with lock:
+                    done.append(index)
+                    fraction = len(done) / len(segments)
+                progress(fraction)
+            return segment
+
+        logging.info(f"Synthesising {len(segments)} segments in {lang}")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(carrying_metrics(work), enumerate(segments)))
+
+    def fit(self, segments: List[DubSegment], total_duration: float) -> List[DubSegment]:
+        cursor = 0.0
+        for i, segment in enumerate(segments):
+            slot_end = segments[i + 1].start if i + 1 < len(segments) else total_duration
+            segment.offset = max(segment.start, cursor)
+            available = max(slot_end - segment.offset, 0.1)
+            segment.tempo = min(max(segment.duration / available, 1.0), self.max_tempo)
+            cursor = segment.offset + segment.duration / segment.tempo
+        if cursor > total_duration:
+            logging.warning(f"Dubbed audio overruns the video by {cursor - total_duration:.1f} seconds")
+        return segments
+
+    def assemble(self, segments: List[DubSegment], total_duration: float, output_path: str, work_dir: str):
+        """Mix every clip into one track with a single ffmpeg filter graph."""
+        graph = []
+        labels = []
+        for i, segment in enumerate(segments):
+            delay_ms = int(round(segment.offset * 1000))
+            graph.append(
+                f"[{i}:a]aformat=sample_rates={SAMPLE_RATE}:channel_layouts=mono,"
+                f"{atempo_chain(segment.tempo)},adelay={delay_ms}:all=1[a{i}]"
+            )
+            labels.append(f"[a{i}]")
+        if segments:
+            graph.append(f"{''.join(labels)}amix=inputs={len(segments)}:normalize=0:dropout_transition=0,"
+                         f"apad[out]")
+            inputs = [arg for segment in segments for arg in ('-i', segment.audio_path)]
+        else:
+            graph.append(f"anullsrc=r={SAMPLE_RATE}:cl=mono[out]")
+            inputs = []
+
+        script_path = os.path.join(work_dir, 'timeline.filtergraph')
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write(";\n".join(graph))
+        subprocess.run([
+            self.ffmpeg_path, '-y', '-loglevel', 'error', *inputs,
+            '-filter_complex_script', script_path,
+            '-map', '[out]', '-t', f"{total_duration:.3f}", output_path
+        ], check=True, capture_output=True)
+        logging.info(f"Assembled {len(segments)} dubbed segments into {output_path}")
@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from code import VideoTranslator, TranslationResult
+from progress import PipelineCancelled, ProgressEvent
+
+
+# Share of a job's progress bar each stage accounts for
+SHARED_STAGE_WEIGHTS = {'download': 0.15, 'transcribe': 0.35}
+LANGUAGE_STAGE_WEIGHTS = {'translate': 0.1, 'dub': 0.3, 'mux': 0.1}
+MAX_FINISHED_JOBS = 50
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+@dataclass
+class Job:
+    job_id: str
+    source: str
+    languages: List[str]
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    message: str = 'Waiting for a free worker...'
+    stage_progress: Dict[str, float] = field(default_factory=dict)
+    results: Dict[str, TranslationResult] = field(default_factory=dict)
+    error: Optional[str] = None
+    cancel_requested: threading.Event = field(default_factory=threading.Event, repr=False)
+    future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED, CANCELLED)
+
+    @property
+    def progress(self) -> float:
+        """Overall completion from 0 to 1, weighted by how long each stage usually takes."""
+        if self.status == SUCCEEDED:
+            return 1.0
+        total = sum(weight * self.stage_progress.get(stage, 0.0) for stage, weight in SHARED_STAGE_WEIGHTS.items())
+        per_language = 1.0 / max(1, len(self.languages))
+        for lang in self.languages:
+            total += per_language * sum(weight * self.stage_progress.get(f"{stage}:{lang}", 0.0)
+                                        for stage, weight in LANGUAGE_STAGE_WEIGHTS.items())
+        return min(total, 1.0)
+
+
+class JobManager:
+    """Runs translation jobs in the background on a bounded worker pool.
+
+    Jobs live in an in-memory store for the lifetime of the process, so a
+    reloaded page can look a job up again by its ID. Progress comes from
+    VideoTranslator's progress callback; cancelling a job makes that
+    callback raise at the next checkpoint.
+    """
+
+    def __init__(self, translator: VideoTranslator, max_workers: int = 2):
+        self.translator = translator
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='translate-job')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, source: str, languages: List[str]) -> Job:
+        job = Job(job_id=uuid.uuid4().hex[:12], source=source, languages=list(dict.fromkeys(languages)))
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        job.future = self._pool.submit(self._run, job)
+        logging.info(f"Queued job {job.job_id} for {source} ({', '.join(job.languages)})")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None or job.done:
+            return False
+        job.cancel_requested.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, CANCELLED, 'Cancelled before it started')
+        else:
+            with self._lock:
+                job.message = 'Cancelling...'
+        logging.info(f"Cancellation requested for job {job_id}")
+        return True
+
+    def shutdown(self, wait: bool = False):
+        for job in self.list_jobs():
+            if not job.done:
+                job.cancel_requested.set()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _on_progress(self, job: Job, event: ProgressEvent):
+        if job.cancel_requested.is_set():
+            raise PipelineCancelled(f"Job {job.job_id} was cancelled")
+        key = event.stage if event.language is None else f"{event.stage}:{event.language}"
+        with self._lock:
+            job.stage_progress[key] = max(job.stage_progress.get(key, 0.0), event.fraction)
+            if event.status != 'finished':
+                label = event.stage.capitalize() + (f" ({event.language})" if event.language else "")
+                job.message = f"{label}: {event.fraction:.0%}" if event.status == 'progress' else f"{label}..."
+
+    def _run(self, job: Job):
+        with self._lock:
+            job.status = RUNNING
+            job.started_at = time.time()
+            job.message = 'Starting...'
+        try:
+            results = self.translator.process_video_multi(
+                job.source, job.languages, progress_callback=lambda event: self._on_progress(job, event))
+        except Exception as e:
+            logging.error(f"Job {job.job_id} crashed: {str(e)}")
+            self._finish(job, FAILED, 'Processing failed!', error=str(e))
+            return
+        with self._lock:
+            job.results = results
+        if job.cancel_requested.is_set():
+            self._finish(job, CANCELLED, 'Cancelled')
+        elif all(result.success for result in results.values()):
+            self._finish(job, SUCCEEDED, 'Processing complete!')
+        else:
+            errors = {lang: result.error_message for lang, result in results.items() if not result.success}
+            self._finish(job, FAILED, 'Processing failed!',
+                         error="; ".join(f"{lang}: {msg}" for lang, msg in errors.items()))
+
+    def _finish(self, job: Job, status: str, message: str, error: Optional[str] = None):
+        with self._lock:
+            job.status = status
+            job.message = message
+            job.error = error
+            job.finished_at = time.time()
+        logging.info(f"Job {job.job_id} {status}")
+
+    def _prune(self):
+        finished = sorted((job for job in self._jobs.values() if job.done), key=lambda job: job.finished_at)
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.job_id]
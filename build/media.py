@@ -0,0 +1,166 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+AUDIO_CONTAINER = '.mka'  # Matroska holds any codec, so audio can always be stream-copied
+PROBE_CACHE_SIZE = 256  # dubbing probes hundreds of short-lived clips per job
+
+
+@dataclass
+class MediaSource:
+    video_id: str
+    title: str
+    video_path: str
+    audio_path: str
+
+
+def sanitize_filename(filename: str) -> str:
+    # Remove or replace invalid characters
+    filename = re.sub(r'[\\/*?:"<>|]', '', filename)
+    # Replace spaces with underscores
+    filename = re.sub(r'\s+', '_', filename)
+    return filename
+
+
+class MediaIO:
+    """Fetches and inspects media with as few external processes as possible.
+
+    A URL is fetched with one yt-dlp call that also returns its metadata, and
+    the audio track is demuxed from the downloaded video without re-encoding.
+    Local files are used in place. Output is written under a per-call
+    temporary name and moved into place, so concurrent fetches of the same
+    video never interleave writes. ffprobe results for the last
+    ``PROBE_CACHE_SIZE`` files are cached per file version (path, size and
+    mtime), so a file is not probed twice while it is in use.
+    """
+
+    def __init__(self, ffmpeg_path: str, yt_dlp_path: str = 'yt-dlp'):
+        self.ffmpeg_path = ffmpeg_path
+        self.yt_dlp_path = yt_dlp_path
+        self.ffprobe_path = shutil.which('ffprobe')
+        self._probes: 'OrderedDict[tuple, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_local(source: str) -> bool:
+        return os.path.isfile(source)
+
+    def source_id(self, source: str) -> str:
+        """Stable ID for a URL or local file, available without touching the network."""
+        if self.is_local(source):
+            stat = os.stat(source)
+            fingerprint = f"{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}"
+            return 'local-' + hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()[:16]
+        match = re.search(r'(?:v=|youtu\.be/|shorts/|embed/)([A-Za-z0-9_-]{11})', source)
+        if match:
+            return match.group(1)
+        return hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]
+
+    def fetch(self, source: str, video_dir: str, audio_dir: str) -> MediaSource:
+        """Make the video available locally and demux its audio track."""
+        video_id = self.source_id(source)
+        if self.is_local(source):
+            video_path = os.path.abspath(source)
+            title = sanitize_filename(os.path.splitext(os.path.basename(source))[0])
+            logging.info(f"Using local video file: {video_path}")
+        else:
+            info = self._download(source, video_dir)
+            video_path = info['filepath']
+            title = sanitize_filename(info.get('title') or 'untitled_video')
+        audio_path = self.extract_audio(video_path, os.path.join(audio_dir, f'{video_id}{AUDIO_CONTAINER}'))
+        return MediaSource(video_id, title, video_path, audio_path)
+
+    def _download(self, url: str, video_dir: str) -> Dict:
+        logging.info(f"Downloading from URL: {url}")
+        # yt-dlp's fragments, .part files and merge output all stay in a private directory
+        work_dir = tempfile.mkdtemp(dir=video_dir, prefix='.download-')
+        try:
+            result = subprocess.run([
+                self.yt_dlp_path, '--no-simulate', '--no-progress',
+                '--ffmpeg-location', self.ffmpeg_path,
+                '--print', 'after_move:%()j',
+                '-o', os.path.join(work_dir, '%(id)s.%(ext)s'),
+                url
+            ], check=True, capture_output=True, text=True)
+            lines = [line for line in result.stdout.splitlines() if line.strip()]
+            if not lines:
+                raise RuntimeError(f"yt-dlp returned no metadata for {url}")
+            info = json.loads(lines[-1])
+            downloaded = info.get('filepath') or info.get('_filename')
+            if not downloaded or not os.path.exists(downloaded):
+                raise FileNotFoundError(f"yt-dlp reported no downloaded file for {url}")
+            info['filepath'] = os.path.join(video_dir, os.path.basename(downloaded))
+            os.replace(downloaded, info['filepath'])
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        logging.info(f"Downloaded '{info.get('title')}' to {info['filepath']}")
+        return info
+
+    def extract_audio(self, video_path: str, audio_path: str) -> str:
+        """Copy the first audio stream out of ``video_path`` without re-encoding."""
+        root, ext = os.path.splitext(audio_path)
+        tmp_path = f"{root}.{uuid.uuid4().hex[:8]}.tmp{ext}"  # keep the extension so ffmpeg picks the muxer
+        try:
+            subprocess.run([
+                self.ffmpeg_path, '-y', '-loglevel', 'error', '-i', video_path,
+                '-map', '0:a:0', '-vn', '-c:a', 'copy', tmp_path
+            ], check=True, capture_output=True)
+            os.replace(tmp_path, audio_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        logging.info(f"Extracted audio track to {audio_path}")
+        return audio_path
+
+    def probe(self, path: str) -> Dict:
+        """Return ffprobe's format and stream information for ``path``, cached per recent file version."""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._probes.get(key)
+            if cached is not None:
+                self._probes.move_to_end(key)
+                return cached
+        info = self._run_ffprobe(path) if self.ffprobe_path else self._parse_ffmpeg_banner(path)
+        with self._lock:
+            self._probes[key] = info
+            while len(self._probes) > PROBE_CACHE_SIZE:
+                self._probes.popitem(last=False)
+        return info
+
+    def duration(self, path: str) -> Optional[float]:
+        duration = self.probe(path).get('format', {}).get('duration')
+        return float(duration) if duration not in (None, 'N/A') else None
+
+    def _run_ffprobe(self, path: str) -> Dict:
+        result = subprocess.run([
+            self.ffprobe_path, '-v', 'error', '-print_format', 'json',
+            '-show_format', '-show_streams', path
+        ], check=True, capture_output=True, text=True)
+        return json.loads(result.stdout)
+
+    def _parse_ffmpeg_banner(self, path: str) -> Dict:
+        # imageio-ffmpeg ships ffmpeg without ffprobe; its input banner has what we need
+        result = subprocess.run([self.ffmpeg_path, '-hide_banner', '-i', path],
+                                capture_output=True, text=True)
+        info = {'format': {}, 'streams': []}
+        for line in result.stderr.splitlines():
+            match = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', line)
+            if match:
+                h, m, s = match.groups()
+                info['format']['duration'] = str(int(h) * 3600 + int(m) * 60 + float(s))
+            match = re.search(r'Stream #\d+:\d+.*?: (Audio|Video): (\w+)', line)
+            if match:
+                info['streams'].append({'codec_type': match.group(1).lower(), 'codec_name': match.group(2)})
+        return info
@@ -0,0 +1,169 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+@dataclass
+class StageMetrics:
+    """Totals for one stage or method across all of its calls in a run.
+
+    CPU time, I/O and subprocess time are process-wide counters, so stages
+    that overlap on different threads each see the other's work too.
+    ``process_peak_rss_bytes`` is the process's lifetime high-water mark
+    after the latest call, not a peak of this stage alone;
+    ``peak_rss_growth_bytes`` is how far this stage pushed that mark up.
+    """
+
+    calls: int = 0
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    subprocess_time: float = 0.0
+    read_bytes: int = 0
+    write_bytes: int = 0
+    process_peak_rss_bytes: Optional[int] = None
+    peak_rss_growth_bytes: int = 0
+
+
+@dataclass
+class _Snapshot:
+    wall: float
+    cpu: float
+    children: float
+    read_bytes: int
+    write_bytes: int
+    peak_rss: Optional[int]
+
+
+def _children_cpu() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _io_counters():
+    # Characters read and written through syscalls, including pipes from ffmpeg
+    try:
+        with open('/proc/self/io', 'r') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return int(fields['rchar']), int(fields['wchar'])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+
+def peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _snapshot() -> _Snapshot:
+    read_bytes, write_bytes = _io_counters()
+    return _Snapshot(time.perf_counter(), time.process_time(), _children_cpu(), read_bytes, write_bytes,
+                     peak_rss_bytes())
+
+
+@dataclass
+class PipelineMetrics:
+    """Resource usage of one process_video run, per pipeline stage and per VideoTranslator method."""
+
+    stages: Dict[str, StageMetrics] = field(default_factory=dict)
+    methods: Dict[str, StageMetrics] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, name: str, kind: str = 'stages'):
+        before = _snapshot()
+        try:
+            yield
+        finally:
+            after = _snapshot()
+            with self._lock:
+                entry = getattr(self, kind).setdefault(name, StageMetrics())
+                entry.calls += 1
+                entry.wall_time += after.wall - before.wall
+                entry.cpu_time += after.cpu - before.cpu
+                entry.subprocess_time += after.children - before.children
+                entry.read_bytes += after.read_bytes - before.read_bytes
+                entry.write_bytes += after.write_bytes - before.write_bytes
+                entry.process_peak_rss_bytes = after.peak_rss
+                if after.peak_rss is not None:
+                    entry.peak_rss_growth_bytes += after.peak_rss - before.peak_rss
+
+    def copy(self) -> 'PipelineMetrics':
+        with self._lock:
+            return PipelineMetrics(
+                stages={name: StageMetrics(**asdict(m)) for name, m in self.stages.items()},
+                methods={name: StageMetrics(**asdict(m)) for name, m in self.methods.items()},
+            )
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'stages': {name: asdict(m) for name, m in self.stages.items()},
+                'methods': {name: asdict(m) for name, m in self.methods.items()},
+                'peak_rss_bytes': peak_rss_bytes(),
+            }
+
+    def write_trace(self, path: str, **extra):
+        """Write the metrics, plus any ``extra`` fields, as a JSON trace file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({**extra, **self.to_dict()}, f, indent=2)
+
+
+_current_metrics: ContextVar[Optional[PipelineMetrics]] = ContextVar('current_metrics', default=None)
+
+
+@contextmanager
+def collecting(metrics: PipelineMetrics):
+    """Send measurements from instrumented methods on this thread to ``metrics``."""
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+def carrying_metrics(fn):
+    """Wrap ``fn`` so that, run on a worker thread, it records into this thread's collection.
+
+    Pool threads do not inherit context variables, so work submitted to an
+    executor must be wrapped on the submitting thread.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with collecting(metrics):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def instrumented(method):
+    """Record a method's resource usage in the run currently collecting on this thread, if any."""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        metrics = _current_metrics.get()
+        if metrics is None:
+            return method(*args, **kwargs)
+        with metrics.measure(method.__name__, kind='methods'):
+            return method(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,174 @@
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+import whisper
+
+
+DEFAULT_MODEL_SIZE = "base"
+DEFAULT_IDLE_TTL = 30 * 60  # evict models unused for 30 minutes
+
+
+@dataclass
+class _ModelPool:
+    replicas: list = field(default_factory=list)
+    free: list = field(default_factory=list)
+    loading: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    leases: int = 0
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded Whisper models keyed by (size, device).
+
+    Once a model is released, a background timer drops it (and any replicas)
+    after ``idle_ttl`` seconds without use, so an idle process gives the
+    memory back instead of holding every model it ever loaded.
+    """
+
+    def __init__(self, idle_ttl: Optional[float] = DEFAULT_IDLE_TTL):
+        self.idle_ttl = idle_ttl
+        self._pools: Dict[Tuple[str, Optional[str]], _ModelPool] = {}
+        self._cond = threading.Condition()
+        self._timer: Optional[threading.Timer] = None
+
+    def _load(self, model_size: str, device: Optional[str]):
+        logging.info(f"Loading Whisper model '{model_size}' on device {device or 'default'}")
+        start = time.perf_counter()
+        model = whisper.load_model(model_size, device=device)
+        logging.info(f"Loaded Whisper model '{model_size}' in {time.perf_counter() - start:.2f} seconds")
+        return model
+
+    def _acquire(self, model_size: str, device: Optional[str], max_replicas: int):
+        key = (model_size, device)
+        with self._cond:
+            pool = self._pools.setdefault(key, _ModelPool())
+            pool.leases += 1
+            while True:
+                if pool.free:
+                    model = pool.free.pop()
+                    pool.last_used = time.monotonic()
+                    return pool, model
+                if len(pool.replicas) + pool.loading < max(1, max_replicas):
+                    pool.loading += 1
+                    break
+                self._cond.wait()
+
+        # Load outside the registry lock so other sizes stay available meanwhile
+        try:
+            model = self._load(model_size, device)
+        except BaseException:
+            with self._cond:
+                pool.loading -= 1
+                pool.leases -= 1
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            pool.loading -= 1
+            pool.replicas.append(model)
+            pool.last_used = time.monotonic()
+            self._cond.notify_all()
+        return pool, model
+
+    def _release(self, pool: _ModelPool, model):
+        with self._cond:
+            pool.free.append(model)
+            pool.leases -= 1
+            pool.last_used = time.monotonic()
+            self._schedule_eviction()
+            self._cond.notify_all()
+
+    def _schedule_eviction(self):
+        # Called with the lock held; one timer covers every pool
+        if self.idle_ttl is None or self._timer is not None:
+            return
+        deadlines = [pool.last_used + self.idle_ttl for pool in self._pools.values()
+                     if pool.replicas and pool.leases == 0 and pool.loading == 0]
+        if not deadlines:
+            return
+        delay = max(min(deadlines) - time.monotonic(), 0.0) + 1.0
+        self._timer = threading.Timer(delay, self._sweep)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _sweep(self):
+        with self._cond:
+            self._timer = None
+        self.evict_idle()
+        with self._cond:
+            self._schedule_eviction()
+
+    def preload(self, model_size: str = DEFAULT_MODEL_SIZE, device: Optional[str] = None):
+        """Load a model ahead of its first lease.
+
+        Models are only handed out through ``lease``, so nothing can run an
+        instance another thread is transcribing with.
+        """
+        with self.lease(model_size, device):
+            pass
+
+    @contextmanager
+    def lease(self, model_size: str = DEFAULT_MODEL_SIZE, device: Optional[str] = None, max_replicas: int = 1):
+        """Hold a model exclusively while transcribing.
+
+        Whisper installs decoder hooks for the duration of a transcribe call,
+        so two threads must not run the same model instance at once. Callers
+        that transcribe in parallel may allow up to ``max_replicas`` copies of
+        the model; otherwise they queue for the single shared instance.
+        """
+        pool, model = self._acquire(model_size, device, max_replicas)
+        try:
+            yield model
+        finally:
+            self._release(pool, model)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop models that have not been used within ``idle_ttl`` seconds."""
+        if self.idle_ttl is None:
+            return 0
+        now = time.monotonic() if now is None else now
+        with self._cond:
+            stale = [
+                key for key, pool in self._pools.items()
+                if pool.leases == 0 and pool.loading == 0 and now - pool.last_used > self.idle_ttl
+            ]
+            for key in stale:
+                del self._pools[key]
+                logging.info(f"Evicted idle Whisper model '{key[0]}' on device {key[1] or 'default'}")
+        if stale:
+            _release_device_memory()
+        return len(stale)
+
+    def clear(self):
+        with self._cond:
+            for key in [key for key, pool in self._pools.items() if pool.leases == 0]:
+                del self._pools[key]
+        _release_device_memory()
+
+    def loaded(self):
+        with self._cond:
+            return [key for key, pool in self._pools.items() if pool.replicas]
+
+
+def _release_device_memory():
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
+_default_registry: Optional[ModelRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the registry shared by every VideoTranslator in this process."""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ModelRegistry()
+        return _default_registry
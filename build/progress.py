@@ -0,0 +1,63 @@
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+from metrics import PipelineMetrics
+
+
+@dataclass
+class ProgressEvent:
+    stage: str
+    status: str      # 'started', 'progress' or 'finished'
+    fraction: float  # completion of this stage, from 0 to 1
+    language: Optional[str] = None  # None for stages shared by every language
+    message: str = ''
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+class PipelineCancelled(Exception):
+    """Raised from a progress callback to stop a run at its next checkpoint."""
+
+
+class StageLimiter:
+    """Caps how many pipelines may be inside each stage at once, across all jobs.
+
+    Whisper is memory and compute heavy, so by default only one transcription
+    runs at a time while downloads and network-bound stages overlap freely.
+    Stages without a limit are not restricted.
+    """
+
+    DEFAULT_LIMITS = {'download': 4, 'transcribe': 1, 'translate': 8, 'dub': 4, 'mux': 4}
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        limits = self.DEFAULT_LIMITS if limits is None else limits
+        self._semaphores = {stage: threading.BoundedSemaphore(max(1, n)) for stage, n in limits.items()}
+
+    @contextmanager
+    def hold(self, stage: str):
+        semaphore = self._semaphores.get(stage)
+        if semaphore is None:
+            yield
+            return
+        with semaphore:
+            yield
+
+
+@dataclass
+class PipelineRun:
+    """Per-call state threaded through one process_video run: timings, metrics and progress reporting."""
+
+    callback: Optional[ProgressCallback] = None
+    language: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    metrics: PipelineMetrics = field(default_factory=PipelineMetrics)
+
+    def for_language(self, language: str) -> 'PipelineRun':
+        return PipelineRun(self.callback, language, dict(self.timings), self.metrics.copy())
+
+    def report(self, stage: str, status: str, fraction: float, message: str = ''):
+        # Callbacks may raise (e.g. to cancel a job); that aborts the run
+        if self.callback:
+            self.callback(ProgressEvent(stage, status, min(max(fraction, 0.0), 1.0), self.language, message))
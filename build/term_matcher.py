@@ -0,0 +1,117 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from terms import terms_to_preserve
+
+
+# Restores any placeholder form produced by placeholder_for, whatever its case
+_PLACEHOLDER_PATTERN = re.compile(r'_{1,3}term(\d+)_{1,3}', re.IGNORECASE)
+_END = object()
+
+
+def placeholder_for(index: int, lang: str) -> str:
+    # Different translators mangle underscores differently per language
+    if lang in ['hi', 'ta', 'ml']:
+        return f"_term{index}_"
+    elif lang == 'te':
+        return f"___term{index}___"
+    return f"__term{index}__"
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+class TermMatcher:
+    """Finds preserved terms in a single left-to-right pass over the text.
+
+    Terms are lower-cased, de-duplicated and stored in a character trie, so
+    each position is matched against every term at once and the longest
+    term wins ("binary search tree" over "binary"). Terms are matched
+    literally, so entries such as ``O(n)`` need no regex escaping. Like the
+    old ``\\b`` patterns, a term edge that is a word character must not be
+    glued to another word character in the text.
+    """
+
+    def __init__(self, terms: List[str]):
+        self.terms: List[str] = []
+        self._trie: Dict = {}
+        seen = set()
+        for term in terms:
+            key = term.strip().lower()
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            node = self._trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[_END] = len(self.terms)
+            self.terms.append(term.strip())
+
+    def _match_at(self, text: str, start: int) -> Tuple[int, int]:
+        """Return (term index, end) of the longest term starting at ``start``, or (-1, start)."""
+        node = self._trie
+        best, best_end = -1, start
+        i = start
+        n = len(text)
+        while i < n:
+            node = node.get(text[i].lower())
+            if node is None:
+                break
+            i += 1
+            index = node.get(_END)
+            if index is not None and (i == n or not _is_word_char(text[i]) or not _is_word_char(text[i - 1])):
+                best, best_end = index, i
+        return best, best_end
+
+    def protect(self, text: str, lang: str) -> Tuple[str, Dict[str, str]]:
+        """Replace every preserved term with a placeholder and return the mapping."""
+        out = []
+        placeholders = {}
+        last = 0
+        i = 0
+        n = len(text)
+        prev_is_word = False
+        while i < n:
+            ch = text[i]
+            is_word = _is_word_char(ch)
+            # A term may only start where a \b would sit, or at a non-word character
+            if not (is_word and prev_is_word):
+                index, end = self._match_at(text, i)
+                if index >= 0:
+                    placeholder = placeholder_for(index, lang)
+                    out.append(text[last:i])
+                    out.append(placeholder)
+                    placeholders[placeholder] = self.terms[index]
+                    last = i = end
+                    prev_is_word = _is_word_char(text[end - 1])
+                    continue
+            prev_is_word = is_word
+            i += 1
+        out.append(text[last:])
+        return ''.join(out), placeholders
+
+    def restore(self, text: str) -> str:
+        """Put the original terms back in place of their placeholders."""
+        def replace(match):
+            index = int(match.group(1))
+            if index >= len(self.terms):
+                return match.group(0)
+            return self.terms[index]
+        return _PLACEHOLDER_PATTERN.sub(replace, text)
+
+
+# Built once at import so every translation reuses the same trie
+default_matcher = TermMatcher(terms_to_preserve)
+
+
+@lru_cache(maxsize=8)
+def _matcher_for_terms(terms: Tuple[str, ...]) -> TermMatcher:
+    return TermMatcher(list(terms))
+
+
+def get_matcher(terms: List[str]) -> TermMatcher:
+    """Return a matcher for ``terms``, reusing the prebuilt one for the default list."""
+    if terms is terms_to_preserve:
+        return default_matcher
+    return _matcher_for_terms(tuple(terms))
@@ -0,0 +1,206 @@
+import logging
+import random
+import re
+import textwrap
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from deep_translator import GoogleTranslator
+from cache import ArtifactCache, hash_text
+from metrics import carrying_metrics
+
+
+MAX_CHUNK_CHARS = 5000  # Google Translate's per-request limit
+_SENTENCE_END = re.compile(r'(?<=[.!?।])\s+')
+
+
+def split_sentences(text: str, max_chars: int = MAX_CHUNK_CHARS) -> List[str]:
+    """Pack whole sentences into chunks of at most ``max_chars`` characters.
+
+    Sentences longer than the limit fall back to whitespace wrapping.
+    """
+    chunks = []
+    current = ''
+    for sentence in _SENTENCE_END.split(text.strip()):
+        if not sentence:
+            continue
+        pieces = [sentence] if len(sentence) <= max_chars else \
+            textwrap.wrap(sentence, width=max_chars, break_long_words=False, replace_whitespace=False)
+        for piece in pieces:
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class TranslationBackend(ABC):
+    """Translates one piece of text. Subclasses must be safe to call from several threads."""
+
+    name = 'base'
+
+    @abstractmethod
+    def translate(self, text: str, target: str, source: str = 'auto') -> str:
+        """Return ``text`` translated into ``target``."""
+
+
+class GoogleTranslationBackend(TranslationBackend):
+    """Google Translate through deep_translator's GoogleTranslator.
+
+    Each worker thread keeps one GoogleTranslator per language pair, which
+    saves re-validating the languages on every chunk. It does not reuse
+    HTTP connections: deep_translator calls ``requests.get`` directly and
+    offers no way to pass a session, so every request still opens its own
+    connection. Concurrency in TranslationService hides that latency rather
+    than removing it.
+    """
+
+    name = 'google'
+
+    def __init__(self):
+        # GoogleTranslator keeps per-request state on the instance, so each
+        # worker thread reuses its own client rather than sharing one
+        self._local = threading.local()
+
+    def _client(self, source: str, target: str) -> GoogleTranslator:
+        clients = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = {}
+        client = clients.get((source, target))
+        if client is None:
+            client = clients[(source, target)] = GoogleTranslator(source=source, target=target)
+        return client
+
+    def translate(self, text: str, target: str, source: str = 'auto') -> str:
+        return self._client(source, target).translate(text)
+
+
+class LocalTranslationBackend(TranslationBackend):
+    """Deterministic offline stand-in that tags text with the target language.
+
+    ``latency`` simulates a network round trip so throughput can be measured
+    without reaching Google.
+    """
+
+    name = 'local'
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def translate(self, text: str, target: str, source: str = 'auto') -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return "\n".join(f"[{target}] {line}" for line in text.split("\n"))
+
+
+class TranslationService:
+    """Runs a backend over many chunks with caching, bounded parallelism and retries.
+
+    Requests go through one long-lived worker pool shared by every call, so
+    at most ``max_workers`` are in flight and backends that keep a client
+    per thread reuse it from call to call.
+    """
+
+    def __init__(self, backend: TranslationBackend, cache: Optional[ArtifactCache] = None,
+                 max_workers: int = 4, max_retries: int = 3, backoff: float = 1.0,
+                 min_interval: float = 0.0):
+        self.backend = backend
+        self.cache = cache
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.min_interval = min_interval
+        self._rate_lock = threading.Lock()
+        self._next_request = 0.0
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='translate')
+
+    def _cache_key(self, text: str, target: str) -> str:
+        return ArtifactCache.make_key(hash_text(text), 'translate_segment', language=target, backend=self.backend.name)
+
+    def _wait_for_slot(self):
+        if not self.min_interval:
+            return
+        with self._rate_lock:
+            now = time.monotonic()
+            start = max(now, self._next_request)
+            self._next_request = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+    def _translate_one(self, text: str, target: str, source: str) -> str:
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_slot()
+            try:
+                return self.backend.translate(text, target, source)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff * 2 ** attempt * (1 + random.random())
+                logging.warning(f"Translation request failed ({str(e)}), retrying in {delay:.1f} seconds")
+                time.sleep(delay)
+
+    def translate_chunks(self, chunks: List[str], target: str, source: str = 'auto') -> List[str]:
+        """Translate ``chunks`` in order, reusing cached segments where possible."""
+        results: Dict[int, str] = {}
+        missing = []
+        for i, chunk in enumerate(chunks):
+            if not chunk.strip():
+                results[i] = chunk
+                continue
+            cached = self.cache.get_json(self._cache_key(chunk, target)) if self.cache else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                missing.append(i)
+        logging.info(f"Translating {len(missing)} of {len(chunks)} chunks to {target} "
+                     f"({len(chunks) - len(missing)} cached)")
+
+        def work(i: int) -> str:
+            translated = self._translate_one(chunks[i], target, source)
+            if self.cache:
+                try:
+                    self.cache.put_json(self._cache_key(chunks[i], target), translated, stage='translate_segment')
+                except Exception as e:
+                    logging.warning(f"Failed to cache translated segment: {str(e)}")
+            return translated
+
+        for i, translated in zip(missing, self._pool.map(carrying_metrics(work), missing)):
+            results[i] = translated
+        if self.cache:
+            self.cache.flush()
+        return [results[i] for i in range(len(chunks))]
+
+    def translate_lines(self, lines: List[str], target: str, source: str = 'auto',
+                        max_chars: int = MAX_CHUNK_CHARS) -> List[str]:
+        """Translate short texts such as subtitle segments, several per request.
+
+        Lines are packed newline-separated into requests of at most
+        ``max_chars``. If a response does not split back into the same number
+        of lines, that batch is retried one line per request.
+        """
+        batches = []
+        current = []
+        size = 0
+        for line in (line.replace("\n", " ") for line in lines):
+            if current and size + 1 + len(line) > max_chars:
+                batches.append(current)
+                current, size = [], 0
+            current.append(line)
+            size += len(line) + 1
+        if current:
+            batches.append(current)
+
+        translated_batches = self.translate_chunks(["\n".join(batch) for batch in batches], target, source)
+        results = []
+        for batch, translated in zip(batches, translated_batches):
+            parts = (translated or "").split("\n")
+            if len(parts) != len(batch):
+                logging.warning(f"Batch of {len(batch)} lines came back as {len(parts)}, translating line by line")
+                parts = self.translate_chunks(batch, target, source)
+            results.extend(part.strip() for part in parts)
+        return results
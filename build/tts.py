@@ -0,0 +1,75 @@
+import logging
+import subprocess
+from abc import ABC, abstractmethod
+from typing import Optional
+from gtts import gTTS
+from cache import ArtifactCache, hash_text
+
+
+class TTSBackend(ABC):
+    """Synthesises speech for one piece of text. Must be safe to call from several threads."""
+
+    name = 'base'
+    extension = 'mp3'
+
+    @abstractmethod
+    def synthesize(self, text: str, lang: str, out_path: str) -> str:
+        """Write speech for ``text`` and return the path of the audio file."""
+
+
+class GTTSBackend(TTSBackend):
+    name = 'gtts'
+
+    def synthesize(self, text: str, lang: str, out_path: str) -> str:
+        gTTS(text=text, lang=lang).save(out_path)
+        return out_path
+
+
+class LocalTTSBackend(TTSBackend):
+    """Offline stand-in that renders a tone whose length follows the text length."""
+
+    name = 'local'
+    extension = 'wav'
+
+    def __init__(self, ffmpeg_path: str, seconds_per_char: float = 0.06):
+        self.ffmpeg_path = ffmpeg_path
+        self.seconds_per_char = seconds_per_char
+
+    def synthesize(self, text: str, lang: str, out_path: str) -> str:
+        duration = max(0.2, len(text) * self.seconds_per_char)
+        subprocess.run([
+            self.ffmpeg_path, '-y', '-loglevel', 'error',
+            '-f', 'lavfi', '-i', f'sine=frequency=220:duration={duration:.3f}',
+            '-ac', '1', '-ar', '24000', out_path
+        ], check=True, capture_output=True)
+        return out_path
+
+
+class CachedTTSBackend(TTSBackend):
+    """Reuses earlier synthesis of the same text, language and backend from the artifact cache.
+
+    Clips are always returned at ``out_path``, never inside the cache, so
+    later cache writes cannot evict a clip the caller still has to read.
+    """
+
+    def __init__(self, backend: TTSBackend, cache: Optional[ArtifactCache]):
+        self.backend = backend
+        self.cache = cache
+        self.name = backend.name
+        self.extension = backend.extension
+
+    def synthesize(self, text: str, lang: str, out_path: str) -> str:
+        if not self.cache:
+            return self.backend.synthesize(text, lang, out_path)
+        key = ArtifactCache.make_key(hash_text(text), 'tts_segment', language=lang, backend=self.backend.name)
+        file_name = f'speech.{self.extension}'
+        # out_path is a fresh name in the caller's work directory, so a hard link is safe
+        if self.cache.export(key, file_name, out_path, link=True):
+            return out_path
+        path = self.backend.synthesize(text, lang, out_path)
+        try:
+            self.cache.put(key, files={file_name: path}, stage='tts_segment')
+        except Exception as e:
+            logging.warning(f"Failed to cache synthesised segment: {str(e)}")
+        return path
+